@@ -1,7 +1,7 @@
 """
 Combine geometry under parent of first selected geo and inherts it's name. 
-You can also choose if you want to take subdivisions and material tags in 
-consideration.
+You can also choose if you want to take subdivisions, material tags and 
+assigned shading groups in consideration.
 
 Author: Jan Jinda
 Email: jj@dneg.com
@@ -9,8 +9,168 @@ Version: 1.0.0
 """
 
 # Usual imports
+import json
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 import subdiv_attrs
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+# Divider between a geometry name and its material tag, e.g. panel_001__painted_red_metal_comp_geo
+TAG_DIVIDER = '__'
+# Maximum number of geometries united by a single polyUnite in chunked combine
+CHUNK_SIZE = 500
+# Attributes of a combined geometry storing its pieces for uncombine
+MANIFEST_ATTR = 'jjCombinePieces'
+VERTICES_ATTR = 'jjCombineVertices'
+FACES_ATTR = 'jjCombineFaces'
+# Keys understood by classify, any function taking a geometry name can be used as a key too
+GROUP_KEYS = ('subD', 'tag', 'shadingGroup', 'parent')
+
+
+def geoShapes(geos):
+    """Map geometries to their mesh shapes with a single query.
+
+    Args:
+        geos: expect a list of geometry transforms
+
+    Returns:
+        A dict with long geometry names as keys and lists of long shape names as values.
+        For example:
+
+        {'|C_head_grp|panel_001__painted_red_metal_comp_geo':
+            ['|C_head_grp|panel_001__painted_red_metal_comp_geo|panel_001__painted_red_metal_comp_geoShape']}
+    """
+
+    # Empty list would make ls and listRelatives work on the whole scene or selection
+    if not geos:
+        return {}
+
+    shapesDict = dict((geo, []) for geo in cmds.ls(geos, long=True))
+    shapes = cmds.listRelatives(geos, shapes=True, type='mesh', fullPath=True, noIntermediate=True) or []
+
+    for shape in shapes:
+        geo = shape.rsplit('|', 1)[0]
+        if geo in shapesDict:
+            shapesDict[geo].append(shape)
+
+    return shapesDict
+
+
+def geoTag(geo):
+    """Get a material tag from a geometry name.
+
+    Args:
+        geo: expect a geometry name, short or long
+
+    Returns:
+        A tag string or None for untagged geometries. For example: 'painted_red_metal_comp'
+    """
+
+    parts = geo.rsplit('|', 1)[-1].split(TAG_DIVIDER)
+    if len(parts) < 2:
+        return None
+
+    return parts[1].replace('_geo', '')
+
+
+def queryGeoData(geos, keys):
+    """Query everything needed by given keys for all geometries at once.
+
+    Every key costs at most one Maya query for the whole list, no matter how many
+    geometries are passed.
+
+    Args:
+        geos: expect a list of geometries
+        keys: expect a list of key names from GROUP_KEYS
+
+    Returns:
+        A dict with a key name as a key and a dict of long geometry name to value as a value.
+        For example:
+
+        {'subD': {'|panel_001__painted_red_metal_comp_geo': True},
+         'tag': {'|panel_001__painted_red_metal_comp_geo': 'painted_red_metal_comp'}}
+    """
+
+    shapesDict = geoShapes(geos)
+    allShapes = [shape for shapes in shapesDict.values() for shape in shapes]
+    data = {}
+
+    if 'subD' in keys:
+        # ls returns just the plugs which exist
+        plugs = cmds.ls(['%s.rexSubdiv' % shape for shape in allShapes], long=True) if allShapes else []
+        subDShapes = set(plug.split('.')[0] for plug in plugs or [])
+        data['subD'] = dict((geo, any(shape in subDShapes for shape in shapes))
+                            for geo, shapes in shapesDict.items())
+
+    if 'tag' in keys:
+        data['tag'] = dict((geo, geoTag(geo)) for geo in shapesDict)
+
+    if 'shadingGroup' in keys:
+        data['shadingGroup'] = shadingGroups(shapesDict)
+
+    if 'parent' in keys:
+        data['parent'] = dict((geo, geo.rsplit('|', 1)[0] or None) for geo in shapesDict)
+
+    return data
+
+
+def shadingGroups(shapesDict):
+    """Find shading groups of geometries through their dag paths.
+
+    Shaders are queried per dag path as uncombine does, so instanced shapes get
+    shading groups of their own instance and no names have to be matched.
+
+    Args:
+        shapesDict: expect an output of geoShapes
+
+    Returns:
+        A dict with long geometry names as keys and sorted tuples of shading groups as values.
+    """
+
+    groupsDict = {}
+
+    for geo, shapes in shapesDict.items():
+        groups = set()
+        for shape in shapes:
+            selList = om.MSelectionList()
+            selList.add(shape)
+            dagPath = selList.getDagPath(0)
+            shaders, faceShaders = om.MFnMesh(dagPath).getConnectedShaders(dagPath.instanceNumber())
+            groups.update(om.MFnDependencyNode(shader).name() for shader in shaders)
+        groupsDict[geo] = tuple(sorted(groups))
+
+    return groupsDict
+
+
+def classify(geos, keys):
+    """Group geometries by any combination of keys in a single pass.
+
+    Args:
+        geos: expect a list of geometries
+        keys: expect a list of key names from GROUP_KEYS or functions taking
+            a long geometry name and returning a hashable value
+
+    Returns:
+        An ordered dict with tuples of key values as keys and lists of long geometry
+        names as values. For example, with keys ['subD', 'tag']:
+
+        {(True, 'painted_red_metal_comp'): ['|panel_001__painted_red_metal_comp_geo'],
+         (False, 'heavy_metal_comp'): ['|canister_001__heavy_metal_comp_geo']}
+    """
+
+    data = queryGeoData(geos, [key for key in keys if not callable(key)])
+    groups = OrderedDict()
+
+    for geo in cmds.ls(geos, long=True) if geos else []:
+        groupKey = tuple(key(geo) if callable(key) else data[key].get(geo) for key in keys)
+        groups.setdefault(groupKey, []).append(geo)
+
+    return groups
+
 
 def subDFilter(inputList):
     """Create dictionary based on RexSubD Attribute.
@@ -29,21 +189,12 @@ def subDFilter(inputList):
     """
     
     subDDict = {}
-    
-    for shape in inputList:
-        # Query REX Subdiv attributes on the shape node
-        if cmds.objExists('%s.rexSubdiv' % shape):
-            attr = 'subD'
-        else:
-            attr = 'noSubD'
-        
-        geo = cmds.listRelatives(shape, parent=True)[0]
-        # Populate a dictionary based on subDiv attributes
-        if subDDict.has_key(attr):
-            subDDict[attr].append(geo)
-        else:
-            subDDict[attr] = [geo]
-        
+    geos = cmds.listRelatives(inputList, parent=True, fullPath=True) or []
+
+    for key, geoList in classify(geos, ['subD']).items():
+        attr = 'subD' if key[0] else 'noSubD'
+        subDDict[attr] = [geo.split('|')[-1] for geo in geoList]
+
     return subDDict
 
 def tagFilter(inputList):
@@ -62,47 +213,148 @@ def tagFilter(inputList):
          'heavy_metal_comp_geo': ('canister_001__heavy_metal_comp_geo'),}
     """
     tagsDict = {}
-    tagDivider='__'
     
     for geo in inputList:
         # Separate a tag from geometry name
-        tag = (geo.split(tagDivider)[1]).replace('_geo','')        
+        tag = geoTag(geo)
+        # Untagged geometries are left out
+        if tag is None:
+            cmds.warning("%s has no material tag, skipped." % geo)
+            continue
         # Populate a dictionary based on material tags
-        if tagsDict.has_key(tag):
-            tagsDict[tag].append(geo)
-        else:
-            tagsDict[tag] = [geo]
+        tagsDict.setdefault(tag, []).append(geo)
             
     return tagsDict
     
-def combine(inputList, subds=False):
-    """Combine geometries from a list.
+def uniteChunked(inputList, name, chunkSize=CHUNK_SIZE):
+    """Combine geometries by a tree reduction.
+
+    Unite geometries in chunks of a fixed size, then unite the intermediate
+    results the same way until a single geometry is left. History is deleted
+    at every level, so no polyUnite ever holds more than chunkSize inputs.
+
+    Args:
+        inputList: expect a list with geometries
+        name: expect a name of the final geometry
+        chunkSize: expect a maximum number of geometries per polyUnite
+
+    Returns:
+        A name of the combined geometry. For example: 'panel_001__painted_red_metal_comp_geo_X'
+    """
+
+    chunkSize = max(2, chunkSize)
+    meshes = list(inputList)
+    levels = 0
+    # Every level has about chunkSize times less meshes than the previous one
+    count = len(meshes)
+    while count > 1:
+        count = (count + chunkSize - 1) // chunkSize
+        levels += 1
+
+    # Progress window is not available in batch mode
+    interactive = not cmds.about(batch=True)
+    if interactive:
+        cmds.progressWindow(title='Combine', progress=0, maxValue=levels, status='Combining',
+                            isInterruptable=False)
+
+    try:
+        level = 0
+        while len(meshes) > 1:
+            united = []
+            for i in range(0, len(meshes), chunkSize):
+                chunk = meshes[i:i + chunkSize]
+                if len(chunk) == 1:
+                    united.append(chunk[0])
+                    continue
+                mesh = cmds.polyUnite(chunk, ch=True, mergeUVSets=True, name='%s_L%s' % (name, level))[0]
+                cmds.delete(mesh, constructionHistory=True)
+                united.append(mesh)
+
+            # Intermediate meshes of previous level are left as empty transforms
+            if level:
+                kept = set(united)
+                leftovers = cmds.ls([mesh for mesh in meshes if mesh not in kept])
+                if leftovers:
+                    cmds.delete(leftovers)
+
+            print 'Combine level %s: %s meshes united into %s' % (level, len(meshes), len(united))
+            meshes = united
+            level += 1
+
+            if interactive:
+                cmds.progressWindow(edit=True, progress=level, status='Level %s/%s' % (level, levels))
+    finally:
+        if interactive:
+            cmds.progressWindow(endProgress=True)
+
+    return cmds.rename(meshes[0], name)
+
+def renameCombined(geos):
+    """Rename combined geometries based on a name of their first piece.
+
+    Has to run after history is deleted, as long as the pieces exist Maya
+    would add a number to the name.
+
+    Args:
+        geos: expect a list of combined geometries with _X suffix
+
+    Returns:
+        A list of new names. For example: ['panel_001__painted_red_metal_comp_geo']
+    """
+
+    return [cmds.rename(geo, geo.split('|')[-1][:-2]) for geo in geos]
+
+def combine(inputList, subds=False, deferHistory=False, chunkSize=None, manifest=True):
+    """Combine geometries.
 
     Combine geometries from a list, parent the result geometry to under
     a parent of a first item in the list. It also rename it based on a
-    first item in a list.
+    first item in a list. History is deleted only on the new geometry.
 
     Args:
         inputList: expect a list with geometries
+        subds: expect boolean if subdivision attributes should be added
+        deferHistory: expect boolean if history deletion should be left to a caller,
+            so history of all combined geometries can be deleted in a single call,
+            the caller then renames them by renameCombined
+        chunkSize: expect a maximum number of geometries per polyUnite, bigger lists
+            are combined by uniteChunked
+        manifest: expect boolean if names, parents and sizes of the pieces should be
+            stored on the new geometry, so it can be split back by uncombine
         
     Returns:
-        A name of a new combined geometry. For example: 'panel_001__painted_red_metal_comp_geo'
+        A name of a new combined geometry. For example: 'panel_001__painted_red_metal_comp_geo',
+        'panel_001__painted_red_metal_comp_geo_X' with deferred history.
     """
     
     if len(inputList) > 1:
         # Find parent groups
         parentGrp = cmds.listRelatives(inputList, parent=True)
+        if manifest:
+            # Pieces are united in the list order, so their vertices and faces follow each other
+            longList = cmds.ls(inputList, long=True)
+            counts = meshCounts(longList)
+            pieces = [(geo.split('|')[-1], geo.rsplit('|', 1)[0] or None) + counts[geo] for geo in longList]
         # Combine geometries present in the list and adds suffix to create unique name
-        combinedMesh = cmds.polyUnite(inputList, ch=True, mergeUVSets=True, name="%s_X" % inputList[0])[0]        
+        name = "%s_X" % inputList[0].split('|')[-1]
+        if chunkSize and len(inputList) > chunkSize:
+            combinedMesh = uniteChunked(inputList, name, chunkSize=chunkSize)
+        else:
+            combinedMesh = cmds.polyUnite(inputList, ch=True, mergeUVSets=True, name=name)[0]
         # Check if a parent exists and paimport subdiv_attrsrents new geometry to a original parent of first item in a list
         if parentGrp:
-            cmds.parent(combinedMesh, parentGrp[0])
-        
-        cmds.delete(constructionHistory=True)
-        # Rename a new geometry based on a name of first item in a list
-        newMesh = cmds.rename(combinedMesh, combinedMesh[:-2])
+            combinedMesh = cmds.parent(combinedMesh, parentGrp[0])[0]
+
+        if deferHistory:
+            # Pieces exist until history is deleted, renaming now would clash with the first one
+            newMesh = combinedMesh
+        else:
+            cmds.delete(combinedMesh, constructionHistory=True)
+            newMesh = renameCombined([combinedMesh])[0]
         if subds:
             subdiv_attrs.add_subdiv(cmds.listRelatives(newMesh, shapes=True))
+        if manifest:
+            storeManifest(newMesh, pieces)
         
         newGeos.append(newMesh)
     else:
@@ -111,15 +363,363 @@ def combine(inputList, subds=False):
     print newMesh
     return newMesh
 
-def batchCombine(subds, tags):
+def storeManifest(geo, pieces):
+    """Store pieces of a combined geometry on its transform.
+
+    Names and parents are stored as a json string, vertex and face counts
+    as integer arrays.
+
+    Args:
+        geo: expect a combined geometry
+        pieces: expect a list of (name, parent, vertices, faces) tuples in the combine order
+    """
+
+    for attr, dataType in ((MANIFEST_ATTR, 'string'), (VERTICES_ATTR, 'Int32Array'), (FACES_ATTR, 'Int32Array')):
+        if not cmds.attributeQuery(attr, node=geo, exists=True):
+            cmds.addAttr(geo, longName=attr, dataType=dataType)
+
+    cmds.setAttr('%s.%s' % (geo, MANIFEST_ATTR), json.dumps([piece[:2] for piece in pieces]), type='string')
+    cmds.setAttr('%s.%s' % (geo, VERTICES_ATTR), [piece[2] for piece in pieces], type='Int32Array')
+    cmds.setAttr('%s.%s' % (geo, FACES_ATTR), [piece[3] for piece in pieces], type='Int32Array')
+
+
+def readManifest(geo):
+    """Read pieces stored on a combined geometry.
+
+    Args:
+        geo: expect a combined geometry
+
+    Returns:
+        A list of (name, parent, vertices, faces) tuples or None if nothing is stored.
+    """
+
+    if not cmds.attributeQuery(MANIFEST_ATTR, node=geo, exists=True):
+        return None
+
+    names = json.loads(cmds.getAttr('%s.%s' % (geo, MANIFEST_ATTR)) or '[]')
+    vertices = cmds.getAttr('%s.%s' % (geo, VERTICES_ATTR)) or []
+    faces = cmds.getAttr('%s.%s' % (geo, FACES_ATTR)) or []
+
+    return [(name, parent, numVertices, numFaces)
+            for (name, parent), numVertices, numFaces in zip(names, vertices, faces)]
+
+
+def faceRanges(faces):
+    """Compress sorted face indices into component names.
+
+    Args:
+        faces: expect a sorted list of face indices
+
+    Returns:
+        A list of face ranges. For example: ['f[0:11]', 'f[16]']
+    """
+
+    ranges = []
+    for face in faces:
+        if ranges and ranges[-1][1] == face - 1:
+            ranges[-1][1] = face
+        else:
+            ranges.append([face, face])
+
+    return ['f[%s]' % start if start == end else 'f[%s:%s]' % (start, end) for start, end in ranges]
+
+
+@contextmanager
+def undoDisabled():
+    """Run a block outside of undo and flush the undo queue afterwards.
+
+    Meshes created through MFnMesh.create are not recorded by undo, undoing the
+    commands around them would leave the scene with duplicated geometry.
+    """
+
+    undoState = cmds.undoInfo(query=True, state=True)
+    cmds.undoInfo(stateWithoutFlush=False)
+
+    try:
+        yield
+    finally:
+        cmds.undoInfo(stateWithoutFlush=undoState)
+        cmds.flushUndo()
+
+
+def uncombine(geo, keep=False):
+    """Split a combined geometry back into its original pieces.
+
+    Pieces are cut out of the combined mesh by the stored vertex and face
+    ranges, so no shells are searched for. Original names, parents, UVs and
+    shading groups are restored, each parent receives all its pieces in
+    a single parent call. Pieces are created outside of undo, so it can not
+    be undone and the undo queue is flushed.
+
+    Args:
+        geo: expect a geometry created by combine with manifest enabled
+        keep: expect boolean if the combined geometry should be kept
+
+    Returns:
+        A list of restored geometries. For example:
+
+        [u'panel_001__painted_red_metal_comp_geo', u'panel_002__painted_red_metal_comp_geo']
+    """
+
+    pieces = readManifest(geo)
+    if not pieces:
+        cmds.warning("%s has no combine manifest, skipped." % geo)
+        return []
+
+    selList = om.MSelectionList()
+    selList.add(geo)
+    dagPath = selList.getDagPath(0)
+    dagPath.extendToShape()
+    fnMesh = om.MFnMesh(dagPath)
+
+    if fnMesh.numVertices != sum(piece[2] for piece in pieces) or \
+            fnMesh.numPolygons != sum(piece[3] for piece in pieces):
+        cmds.warning("Topology of %s changed since combine, skipped." % geo)
+        return []
+
+    points = fnMesh.getPoints(om.MSpace.kWorld)
+    faceCounts, faceVertices = fnMesh.getVertices()
+    us, vs = fnMesh.getUVs()
+    uvCounts, uvIds = fnMesh.getAssignedUVs()
+    hasUVs = len(uvIds) == len(faceVertices)
+    shaders, faceShaders = fnMesh.getConnectedShaders(dagPath.instanceNumber())
+    shadingGroups = [om.MFnDependencyNode(shader).name() for shader in shaders]
+
+    with undoDisabled():
+        byParent = OrderedDict()
+        assignments = {}
+        vertexStart = faceStart = faceVertexStart = 0
+
+        for name, parent, numVertices, numFaces in pieces:
+            counts = list(faceCounts[faceStart:faceStart + numFaces])
+            faceVertexEnd = faceVertexStart + sum(counts)
+            connects = [i - vertexStart for i in faceVertices[faceVertexStart:faceVertexEnd]]
+            piecePoints = om.MPointArray([points[i] for i in range(vertexStart, vertexStart + numVertices)])
+
+            newFn = om.MFnMesh()
+            if hasUVs:
+                # UV indices are not guaranteed to follow each other, remap used ones only
+                uvMap = OrderedDict()
+                pieceUVs = [uvMap.setdefault(i, len(uvMap)) for i in uvIds[faceVertexStart:faceVertexEnd]]
+                meshObj = newFn.create(piecePoints, counts, connects, [us[i] for i in uvMap], [vs[i] for i in uvMap])
+                newFn.assignUVs(counts, pieceUVs)
+            else:
+                meshObj = newFn.create(piecePoints, counts, connects)
+
+            dagFn = om.MFnDagNode(meshObj)
+            dagFn.setName(name)
+            newGeo = dagFn.fullPathName()
+            byParent.setdefault(parent, []).append(newGeo)
+
+            # Collect per face shading groups, faces without a shader get the default one
+            pieceShaders = {}
+            for face in range(numFaces):
+                index = faceShaders[faceStart + face]
+                sg = shadingGroups[index] if index >= 0 else 'initialShadingGroup'
+                pieceShaders.setdefault(sg, []).append(face)
+            for sg, faces in pieceShaders.items():
+                assignments.setdefault(sg, []).extend('%s.%s' % (newGeo, i) for i in faceRanges(faces))
+
+            vertexStart += numVertices
+            faceStart += numFaces
+            faceVertexStart = faceVertexEnd
+
+        for sg, components in assignments.items():
+            cmds.sets(components, forceElement=sg)
+
+        if not keep:
+            cmds.delete(geo)
+
+        # One parent call per parent
+        result = []
+        for parent, geos in byParent.items():
+            if parent and cmds.objExists(parent):
+                result.extend(cmds.parent(geos, parent))
+            else:
+                result.extend(geos)
+
+    print 'Uncombined %s into %s pieces' % (geo, len(result))
+    return result
+
+
+def uncombineSelection(keep=False):
+    """Uncombine all selected geometries.
+
+    Args:
+        keep: expect boolean if combined geometries should be kept
+
+    Returns:
+        A list of restored geometries.
+    """
+
+    restored = []
+    for geo in cmds.ls(selection=True, long=True):
+        restored.extend(uncombine(geo, keep=keep))
+
+    cmds.select(restored)
+    return restored
+
+def _legacyCombine(inputList):
+    """Original combine deleting history of whatever is selected, kept only for benchmarking"""
+
+    parentGrp = cmds.listRelatives(inputList, parent=True)
+    combinedMesh = cmds.polyUnite(inputList, ch=True, mergeUVSets=True,
+                                  name="%s_X" % inputList[0].split('|')[-1])[0]
+    if parentGrp:
+        cmds.parent(combinedMesh, parentGrp[0])
+
+    cmds.delete(constructionHistory=True)
+    return cmds.rename(combinedMesh, combinedMesh[:-2])
+
+def meshSelection():
+    """Get selected geometries with a mesh shape.
+
+    Returns:
+        A list of long names of selected mesh geometries.
+    """
+
+    sel = cmds.ls(selection=True, long=True)
+    # Remove non-mesh geo from list, all shapes are queried at once
+    shapes = cmds.listRelatives(sel, shapes=True, type='mesh', fullPath=True, noIntermediate=True) or []
+    meshParents = set(shape.rsplit('|', 1)[0] for shape in shapes)
+
+    return [obj for obj in sel if obj in meshParents]
+
+
+def combineGroups(geos, subds, tags, keys=(), materials=False):
+    """Split geometries into groups which are combined together.
+
+    Args:
+        geos: expect a list of geometries
+        subds: expect boolean if it should take subdivisions in consideration
+        tags: expect boolean if it should take tags in consideration
+        keys: expect additional keys from GROUP_KEYS or functions taking a long
+            geometry name
+        materials: expect boolean if it should take shading groups in consideration
+
+    Returns:
+        A list of (key values, geometries) tuples and a list of untagged geometries
+        which are skipped. For example:
+
+        ([({'subD': True, 'tag': 'painted_red_metal_comp'}, ['|panel_001__painted_red_metal_comp_geo'])], [])
+    """
+
+    groupKeys = []
+    if subds:
+        groupKeys.append('subD')
+    if tags:
+        groupKeys.append('tag')
+    if materials:
+        groupKeys.append('shadingGroup')
+    groupKeys.extend(keys)
+
+    groups = []
+    skipped = []
+
+    for key, geoList in classify(geos, groupKeys).items():
+        values = dict((k if not callable(k) else getattr(k, '__name__', str(k)), value)
+                      for k, value in zip(groupKeys, key))
+
+        # Untagged geometries are left as they are
+        if tags and values['tag'] is None:
+            skipped.extend(geoList)
+            continue
+
+        groups.append((values, geoList))
+
+    return groups, skipped
+
+
+def meshCounts(geos):
+    """Count vertices and faces of geometries without running a command per geometry.
+
+    Args:
+        geos: expect a list of geometries
+
+    Returns:
+        A dict with a geometry as a key and a (vertices, faces) tuple as a value.
+    """
+
+    counts = {}
+    selList = om.MSelectionList()
+    for geo in geos:
+        selList.add(geo)
+
+    for i, geo in enumerate(geos):
+        dagPath = selList.getDagPath(i)
+        dagPath.extendToShape()
+        fnMesh = om.MFnMesh(dagPath)
+        counts[geo] = (fnMesh.numVertices, fnMesh.numPolygons)
+
+    return counts
+
+
+def planCombine(subds, tags, keys=(), materials=False, path=None):
+    """Plan a combine of selected geometries without modifying the scene.
+
+    Args:
+        subds: expect boolean if it should take subdivisions in consideration
+        tags: expect boolean if it should take tags in consideration
+        keys: expect additional keys from GROUP_KEYS or functions taking a long
+            geometry name
+        materials: expect boolean if it should take shading groups in consideration
+        path: expect a path of a json file the report should be written to
+
+    Returns:
+        A dict report. For example:
+
+        {'geometries': 3, 'combined': 1, 'objectsAfter': 2, 'skipped': [],
+         'groups': [{'keys': {'tag': 'painted_red_metal_comp'},
+                     'geometries': ['|C_head_grp|panel_001__painted_red_metal_comp_geo',
+                                    '|C_head_grp|panel_002__painted_red_metal_comp_geo'],
+                     'parent': '|C_head_grp', 'name': 'panel_001__painted_red_metal_comp_geo',
+                     'combine': True, 'vertices': 16, 'faces': 12}]}
+    """
+
+    sel = meshSelection()
+    groups, skipped = combineGroups(sel, subds, tags, keys, materials=materials)
+    counts = meshCounts(sel)
+
+    report = {'geometries': len(sel), 'skipped': skipped, 'groups': []}
+
+    for values, geoList in groups:
+        report['groups'].append({'keys': values,
+                                 'geometries': geoList,
+                                 'parent': geoList[0].rsplit('|', 1)[0] or None,
+                                 'name': geoList[0].split('|')[-1],
+                                 'combine': len(geoList) > 1,
+                                 'vertices': sum(counts[geo][0] for geo in geoList),
+                                 'faces': sum(counts[geo][1] for geo in geoList)})
+
+    report['combined'] = len([group for group in report['groups'] if group['combine']])
+    report['objectsAfter'] = len(report['groups']) + len(skipped)
+
+    if path:
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    print '%s geometries in %s groups, %s objects after combine' % (report['geometries'], len(report['groups']),
+                                                                   report['objectsAfter'])
+    return report
+
+
+def batchCombine(subds, tags, keys=(), materials=False, deferHistory=False, chunkSize=None):
     """Run a main script.
 
-    Run the main script. Based on a tags attribute it will combine geometries
-    with tags or not.
+    Run the main script. The whole selection is classified in a single pass
+    by all enabled criteria and every group is combined separately.
 
     Args:
         subds: expect boolean if it should take subdivisions in consideration
         tags: expect boolean if it should take tags in consideration
+        keys: expect additional keys from GROUP_KEYS or functions taking a long
+            geometry name, e.g. ['parent']
+        materials: expect boolean if it should take shading groups in consideration,
+            geometries sharing the same shading groups are combined into one mesh
+        deferHistory: expect boolean if history of all new geometries should be
+            deleted in one call at the end instead of once per group
+        chunkSize: expect a maximum number of geometries per polyUnite, e.g. CHUNK_SIZE,
+            groups above it are combined by a tree reduction
         
     Returns:
         A list of newly created geometries. For example:
@@ -129,41 +729,64 @@ def batchCombine(subds, tags):
     """
     
     global sel
-    sel = cmds.ls(selection=True)       
-    # Remove non-mesh geo from list
-    sel = [obj for obj in sel if cmds.listRelatives(obj, children=True, type='mesh')]       
-    shapes = cmds.listRelatives(sel, shapes=True)
-    
+    sel = meshSelection()
+
     # Global list of new geos
     global newGeos
     newGeos = []
 
-    # SubD filter enabled
-    if subds:
-        subDFiltered = subDFilter(shapes)
-        for keyA in subDFiltered:
-            # Tag filter enabled
-            if tags:            
-                tagFiltered = tagFilter(subDFiltered[keyA])
-                for keyB in tagFiltered:
-                    geoList = tagFiltered[keyB]
-                    combine(geoList, subds=True)           
-            # Tag filter disabled
-            else:
-                geoList = subDFiltered[keyA]
-                combine(geoList, subds=True)
-    # SubD filter disabled    
-    else:
-        # Tag filter enabled     
-        if tags:
-            tagFiltered = tagFilter(sel)
-            for keyB in tagFiltered:
-                geoList = tagFiltered[keyB]
-                combine(geoList)
-        # Tag filter disabled
-        else:
-            geoList = sel
-            combine(geoList)
+    groups, skipped = combineGroups(sel, subds, tags, keys, materials=materials)
+    if skipped:
+        cmds.warning("Geometries without a material tag were skipped: %s" % skipped)
+
+    for values, geoList in groups:
+        combine(geoList, subds=bool(values.get('subD')), deferHistory=deferHistory, chunkSize=chunkSize)
+
+    if deferHistory and newGeos:
+        cmds.delete(newGeos, constructionHistory=True)
+        newGeos[:] = renameCombined(newGeos)
 
     cmds.select(newGeos)
     return newGeos
+
+
+def benchmarkHistory(pieces=2000, tags=200):
+    """Compare history deletion modes on synthetic tagged cubes.
+
+    Args:
+        pieces: expect a number of geometries to combine
+        tags: expect a number of material tags the geometries are split into
+
+    Returns:
+        A dict with a mode as a key and seconds as a value. For example:
+
+        {'legacy': 41.2, 'scoped': 6.1, 'deferred': 4.8}
+    """
+
+    global newGeos
+    results = {}
+
+    for mode in ('legacy', 'scoped', 'deferred'):
+        benchGrp = cmds.group(empty=True, name='combineBenchmark_grp')
+        geos = []
+
+        for i in range(pieces):
+            geo = cmds.polyCube(name='piece_%05d__tag%03d_comp_geo' % (i, i % tags), ch=False)[0]
+            cmds.move(i % 100, 0, i // 100, geo)
+            geos.append(cmds.parent(geo, benchGrp)[0])
+
+        cmds.select(geos)
+
+        start = time.time()
+        if mode == 'legacy':
+            newGeos = []
+            for geoList in classify(geos, ['tag']).values():
+                _legacyCombine(geoList)
+        else:
+            batchCombine(False, True, deferHistory=mode == 'deferred')
+        results[mode] = time.time() - start
+
+        cmds.delete(benchGrp)
+        print '%-10s %s geos in %s groups  %.3fs' % (mode, pieces, tags, results[mode])
+
+    return results
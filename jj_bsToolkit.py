@@ -2,8 +2,16 @@
 Blend Shapes related little scripts.
 """
 
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 
+import jj_meshTopology
+import jj_mirror
+import jj_symmetry
+
+# (topology fingerprint, axis, tolerance) as a key, (mapping, unmatched) as a value
+_symmetryCache = {}
+
 
 def bsSelection(suffix):
 
@@ -14,44 +22,120 @@ def bsSelection(suffix):
         newObj= '%s_%s' % (obj,suffix)
 
         if cmds.objExists(newObj):
-           
+
+            if not jj_meshTopology.sameTopology(newObj, obj):
+                cmds.warning("%s topology does not match %s, skipped." % (newObj, obj))
+                continue
+
             blend = cmds.blendShape(newObj, obj)[0]
             cmds.setAttr('%s.%s' % (blend, newObj), 1)
 
 
-def bsMirror():
-    """Mirror hierarchy and rename new objects.
+def bsMirror(axis='X', rules=jj_mirror.SIDE_RULES):
+    """Mirror selected sided shapes onto their opposite side with blend shapes.
     
     Args:
-        None
+        axis: expect a mirror axis, 'X', 'Y' or 'Z'
+        rules: expect a list of (pattern, replacement) pairs swapping side tokens
         
     Returns:
-        Nothing
+        A list of created blend shape deformers.
     """
 
-    source = None
-    target = None
+    # Only sided objects with an existing opposite side are mirrored, filtered the same way mirror does,
+    # so its duplicates follow pairs one to one
+    sel = jj_mirror.mirrorable(cmds.ls(selection=True, o=1))
+    pairs = [(i, jj_mirror.mirrorName(i.rsplit('|', 1)[-1], rules)) for i in sel]
+    pairs = [(i, target) for i, target in pairs if target != i.rsplit('|', 1)[-1] and cmds.objExists(target)]
 
-    # Mirror axis
-    axis='X'
-    
-    # Duplicate selected objects
-    sel = cmds.ls(selection=True, o=1)
-    
-    for i in sel:
-        if i.startswith('R_') or i.startswith('L_'):
-            source = (cmds.duplicate(i, renameChildren=True))[0]
-            cmds.setAttr('%s.scale%s' % (source,axis), -1)
-            cmds.makeIdentity(source, apply=True, t=True, r=True, s=True, pn=True)
-            
-            if source.startswith('R_'):
-                target = ('L_%s' % source[2:-1])
-            elif source.startswith('L_'):
-                target = ('R_%s' % source[2:-1])
-            
-            bSCreate(source, target)
-            
-            cmds.delete(target, constructionHistory=True)
+    if not pairs:
+        return []
+
+    # Duplicate, mirror and freeze all at once
+    sources = jj_mirror.mirror([i for i, target in pairs], axis=axis, rules=rules, rename=False)
+
+    blendShapes = []
+    for source, (i, target) in zip(sources, pairs):
+        blendShapes.append(bSCreate(source, target))
+
+    cmds.delete([target for i, target in pairs], constructionHistory=True)
+
+    return blendShapes
+
+
+def meshPoints(geo):
+    """Returns flat object space x, y, z coordinates of a geometry"""
+
+    return [c for p in jj_meshTopology.meshFn(geo).getPoints(om.MSpace.kObject) for c in (p.x, p.y, p.z)]
+
+
+def symmetryMap(base, axis='X', tolerance=jj_symmetry.TOLERANCE):
+    """Returns symmetry map of a mesh symmetrical in its object space, computed once per topology
+        Parameters:
+            base (str): symmetrical base geometry
+            axis (str): mirror axis, 'X', 'Y' or 'Z'
+            tolerance (float): maximum distance between a reflected vertex and its counterpart
+        Returns:
+            mapping (array): index of the mirrored vertex per vertex
+            unmatched (list): indices of vertices without a counterpart
+    """
+
+    key = (jj_meshTopology.fingerprint(base), axis, tolerance)
+
+    if key not in _symmetryCache:
+        _symmetryCache[key] = jj_symmetry.symmetryMap(meshPoints(base), axis=jj_mirror.AXES.index(axis),
+                                                      tolerance=tolerance)
+        if _symmetryCache[key][1]:
+            cmds.warning("%s vertices of %s have no counterpart, mirrored shapes keep their points." %
+                         (len(_symmetryCache[key][1]), base))
+
+    return _symmetryCache[key]
+
+
+def bsMirrorSymmetry(base, shapes=None, axis='X', rules=jj_mirror.SIDE_RULES):
+    """Mirrors shapes of a symmetrical base onto their opposite side through a symmetry map,
+    missing opposite shapes are duplicated, existing ones are updated in a single undoable call
+        Parameters:
+            base (str): symmetrical base geometry all shapes are sculpted from
+            shapes (list): sided shape geometries, selection by default
+            axis (str): mirror axis, 'X', 'Y' or 'Z'
+            rules (list): (pattern, replacement) pairs swapping side tokens
+        Returns:
+            targets (list): mirrored shape geometries
+    """
+
+    shapes = [i for i in (shapes or cmds.ls(selection=True, o=1)) if i != base]
+    baseFingerprint = jj_meshTopology.fingerprint(base)
+    mapping, unmatched = symmetryMap(base, axis=axis)
+    basePoints = meshPoints(base)
+    axisIndex = jj_mirror.AXES.index(axis)
+    targets = []
+
+    cmds.undoInfo(openChunk=True, chunkName='Mirror Symmetry')
+    try:
+        for shape in shapes:
+            target = jj_mirror.mirrorName(shape, rules)
+
+            if target == shape or jj_meshTopology.fingerprint(shape) != baseFingerprint:
+                cmds.warning("%s is not a sided shape of %s, skipped." % (shape, base))
+                continue
+
+            if not cmds.objExists(target):
+                target = cmds.duplicate(shape, name=target)[0]
+            elif jj_meshTopology.fingerprint(target) != baseFingerprint:
+                cmds.warning("%s topology does not match %s, skipped." % (target, base))
+                continue
+
+            # Vertices without a counterpart keep current points of the target
+            targetPoints = meshPoints(target) if unmatched else None
+            points = jj_symmetry.mirrorPoints(basePoints, meshPoints(shape), mapping, axis=axisIndex,
+                                              unmatched=unmatched, targetPoints=targetPoints)
+            jj_meshTopology.setMeshPoints(target, points)
+            targets.append(target)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return targets
 
 
 def bSCreate(source, target):
@@ -65,7 +149,8 @@ def bSCreate(source, target):
 
     # Create blend shape between source and target
     blendS = cmds.blendShape(source, target)[0]
-    cmds.setAttr('%s.%s' % (blendS, source), 1)
+    # Alias of the weight is a short name of the source, which may be given as a long path
+    cmds.setAttr('%s.weight[0]' % blendS, 1)
     cmds.delete(source)
 
     return blendS
@@ -0,0 +1,200 @@
+"""
+Find small meshes which cost Viewport 2.0 more in draw calls than in geometry and
+combine them with jj_batchCombine. Meshes are proposed for combine only when they share
+the same parent and the same shading groups, combined meshes never exceed a vertex cap.
+
+import jj_drawCallAnalyzer
+report = jj_drawCallAnalyzer.analyze()
+jj_drawCallAnalyzer.reduceDrawCalls(report)
+
+Author: Jan Jinda
+Email: janjinda@janjinda.com
+Version: 1.0.0
+"""
+
+# Usual imports
+import json
+import maya.cmds as cmds
+
+import jj_batchCombine
+
+# Meshes below this vertex count are considered tiny
+SMALL_VERTICES = 1000
+# Maximum number of vertices of a combined mesh
+MAX_VERTICES = 100000
+
+
+def sceneMeshes():
+    """Get all mesh geometries in the scene.
+
+    Returns:
+        A list of long names of transforms with a mesh shape.
+    """
+
+    shapes = cmds.ls(type='mesh', long=True, noIntermediate=True) or []
+    geos = []
+    seen = set()
+
+    for shape in shapes:
+        geo = shape.rsplit('|', 1)[0]
+        if geo not in seen:
+            seen.add(geo)
+            geos.append(geo)
+
+    return geos
+
+
+def drawCalls(shadingGroups):
+    """Estimate draw calls of a mesh, every assigned shading group is drawn separately.
+
+    Args:
+        shadingGroups: expect a tuple of shading groups of a mesh
+
+    Returns:
+        A number of draw calls.
+    """
+
+    return max(1, len(shadingGroups))
+
+
+def packGroup(geos, counts, maxVertices):
+    """Split geometries into bins not exceeding a vertex cap.
+
+    The biggest geometries are placed first, always into the first bin
+    they fit in.
+
+    Args:
+        geos: expect a list of geometries sharing a parent and shading groups
+        counts: expect an output of jj_batchCombine.meshCounts
+        maxVertices: expect a maximum number of vertices per bin
+
+    Returns:
+        A list of (vertices, geometries) tuples.
+    """
+
+    bins = []
+
+    for geo in sorted(geos, key=lambda geo: counts[geo][0], reverse=True):
+        vertices = counts[geo][0]
+        for item in bins:
+            if item[0] + vertices <= maxVertices:
+                item[0] += vertices
+                item[1].append(geo)
+                break
+        else:
+            bins.append([vertices, [geo]])
+
+    return [tuple(item) for item in bins]
+
+
+def analyze(geos=None, smallVertices=SMALL_VERTICES, maxVertices=MAX_VERTICES, path=None):
+    """Estimate draw calls of meshes and propose combine groups.
+
+    Args:
+        geos: expect a list of geometries, all scene meshes by default
+        smallVertices: expect a vertex count under which a mesh is worth combining
+        maxVertices: expect a maximum number of vertices of a combined mesh
+        path: expect a path of a json file the report should be written to
+
+    Returns:
+        A dict report. For example:
+
+        {'objects': 12000, 'drawCalls': 12400, 'objectsAfter': 850, 'drawCallsAfter': 1250,
+         'proposals': [{'geometries': ['|set_grp|bolt_001_geo', '|set_grp|bolt_002_geo'],
+                        'parent': '|set_grp', 'shadingGroups': ['steel_SG'],
+                        'vertices': 16, 'faces': 12, 'drawCallsSaved': 1}]}
+    """
+
+    geos = geos if geos is not None else sceneMeshes()
+    geos = cmds.ls(geos, long=True) if geos else []
+    counts = jj_batchCombine.meshCounts(geos)
+    data = jj_batchCombine.queryGeoData(geos, ['shadingGroup', 'parent'])
+
+    report = {'objects': len(geos), 'proposals': []}
+    report['drawCalls'] = sum(drawCalls(data['shadingGroup'][geo]) for geo in geos)
+
+    tiny = [geo for geo in geos if counts[geo][0] < smallVertices]
+    groups = jj_batchCombine.classify(tiny, ['parent', 'shadingGroup'])
+
+    for (parent, shadingGroups), geoList in groups.items():
+        for vertices, binGeos in packGroup(geoList, counts, maxVertices):
+            if len(binGeos) < 2:
+                continue
+            report['proposals'].append({'geometries': binGeos,
+                                        'parent': parent,
+                                        'shadingGroups': list(shadingGroups),
+                                        'vertices': vertices,
+                                        'faces': sum(counts[geo][1] for geo in binGeos),
+                                        'drawCallsSaved': (len(binGeos) - 1) * drawCalls(shadingGroups)})
+
+    report['proposals'].sort(key=lambda proposal: proposal['drawCallsSaved'], reverse=True)
+    report['objectsAfter'] = report['objects'] - sum(len(i['geometries']) - 1 for i in report['proposals'])
+    report['drawCallsAfter'] = report['drawCalls'] - sum(i['drawCallsSaved'] for i in report['proposals'])
+
+    if path:
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    printReport(report)
+    return report
+
+
+def printReport(report):
+    """Print object and draw call counts of a report.
+
+    Args:
+        report: expect an output of analyze or reduceDrawCalls
+    """
+
+    print 'Objects:    %s -> %s' % (report['objects'], report['objectsAfter'])
+    print 'Draw calls: %s -> %s' % (report['drawCalls'], report['drawCallsAfter'])
+    print 'Combine groups: %s' % len(report['proposals'])
+
+
+def reduceDrawCalls(report=None, limit=None):
+    """Combine proposed groups and measure the result.
+
+    Args:
+        report: expect an output of analyze, selected geometries are analyzed by default
+        limit: expect a maximum number of combined groups, the most saving ones go first
+
+    Returns:
+        A dict report with measured counts. For example:
+
+        {'objects': 12000, 'drawCalls': 12400, 'objectsAfter': 850, 'drawCallsAfter': 1250,
+         'newGeos': ['bolt_001_geo'], 'proposals': [...]}
+    """
+
+    if report is None:
+        report = analyze(jj_batchCombine.meshSelection())
+
+    proposals = report['proposals'][:limit] if limit else report['proposals']
+
+    # Combine appends to a global list of new geos
+    jj_batchCombine.newGeos = []
+    for proposal in proposals:
+        geoList = cmds.ls(proposal['geometries'], long=True)
+        if len(geoList) > 1:
+            jj_batchCombine.combine(geoList, deferHistory=True)
+
+    newGeos = jj_batchCombine.newGeos
+    if newGeos:
+        cmds.delete(newGeos, constructionHistory=True)
+        # Names are free only after history with the pieces is gone
+        newGeos[:] = jj_batchCombine.renameCombined(newGeos)
+
+    # Measure only what is left of analyzed geometries and new ones
+    combined = set(geo for proposal in proposals for geo in proposal['geometries'])
+    untouched = report['objects'] - len(combined)
+    remaining = cmds.ls(newGeos, long=True) if newGeos else []
+    data = jj_batchCombine.queryGeoData(remaining, ['shadingGroup'])
+
+    result = dict(report)
+    result['newGeos'] = newGeos
+    result['objectsAfter'] = untouched + len(remaining)
+    result['drawCallsAfter'] = (report['drawCalls'] - sum(drawCalls(tuple(proposal['shadingGroups'])) *
+                                                          len(proposal['geometries']) for proposal in proposals) +
+                                sum(drawCalls(data['shadingGroup'][geo]) for geo in remaining))
+
+    printReport(result)
+    return result
@@ -8,147 +8,581 @@ Version: 1.0.0
 """
 
 # Usual imports
+import gzip
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 import json
+import os
 import pymel.core as pm
 
-def storeHierarchy(presetFile):
+import jj_mirror
+
+from collections import OrderedDict
+
+# Parent of objects parented to the world
+WORLD = 'world'
+# Version of the preset format, presets without version store {object: parent}
+PRESET_VERSION = 2
+# Extension of compact presets
+COMPACT_EXT = '.jsonl.gz'
+IDENTITY = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+def _matrixList(matrix):
+    """Convert MMatrix to a flat list of 16 floats."""
+    return [matrix[i] for i in range(16)]
+
+
+def snapshotHierarchy(objs):
+    """Capture full paths, parents, sibling order and transforms of objects.
+
+    Paths and parents come from a single ls call, sibling order from one
+    listRelatives call per parent and transforms from one MSelectionList.
+
+    Args:
+        objs: expect a list of DAG objects
+
+    Returns:
+        A dict with a long path as a key and a dict as a value. For example:
+
+        {"|C_head_grp|C_head_panel_0008__painted_metal_brown_comp_geo":
+            {"parent": "|C_head_grp", "index": 3, "matrix": [1.0, 0.0, ...], "worldMatrix": [1.0, 0.0, ...]}
+        }
+    """
+
+    # Empty list would make ls return the whole scene
+    paths = cmds.ls(objs, long=True, type='dagNode') if objs else []
+
+    parents = OrderedDict()
+    for path in paths:
+        parents.setdefault(path.rsplit('|', 1)[0] or WORLD, None)
+
+    # Sibling order per parent
+    order = {}
+    for parent in parents:
+        if parent == WORLD:
+            children = cmds.ls(assemblies=True, long=True)
+        else:
+            children = cmds.listRelatives(parent, children=True, fullPath=True) or []
+        order.update((child, index) for index, child in enumerate(children))
+
+    selList = om.MSelectionList()
+    for path in paths:
+        selList.add(path)
+
+    data = OrderedDict()
+    for i, path in enumerate(paths):
+        dagPath = selList.getDagPath(i)
+        worldMatrix = dagPath.inclusiveMatrix()
+        data[path] = {'parent': path.rsplit('|', 1)[0] or WORLD,
+                      'index': order.get(path, 0),
+                      'matrix': _matrixList(worldMatrix * dagPath.exclusiveMatrixInverse()),
+                      'worldMatrix': _matrixList(worldMatrix)}
+
+    return data
+
+
+def presetPath(presetFile):
+    """Get a path of an existing preset, the newer one wins when both formats exist.
+
+    Args:
+        presetFile: String path to the preset file without an extension
+
+    Returns:
+        A path to the preset file.
+    """
+
+    compactPath = '%s%s' % (presetFile, COMPACT_EXT)
+    jsonPath = '%s.json' % presetFile
+
+    if not os.path.isfile(compactPath):
+        return jsonPath
+    if not os.path.isfile(jsonPath):
+        return compactPath
+
+    return compactPath if os.path.getmtime(compactPath) > os.path.getmtime(jsonPath) else jsonPath
+
+
+def _isIdentity(matrix):
+    return matrix is None or [round(i, 9) for i in matrix] == IDENTITY
+
+
+def writeCompact(presetFile, data):
+    """Write a hierarchy as gzipped records, one json list per line.
+
+    The first line is a header, every other line is
+    [path, parent, index, matrix, worldMatrix], identity matrices are stored as null.
+
+    Args:
+        presetFile: String path to the preset file without an extension
+        data: expect an output of snapshotHierarchy
+
+    Returns:
+        A path to the written file.
+    """
+
+    path = '%s%s' % (presetFile, COMPACT_EXT)
+
+    with gzip.open(path, 'wb') as f:
+        f.write((json.dumps({'version': PRESET_VERSION, 'format': 'records'}) + '\n').encode('utf-8'))
+        for obj, entry in data.items():
+            record = [obj, entry['parent'], entry.get('index'),
+                      None if _isIdentity(entry.get('matrix')) else entry['matrix'],
+                      None if _isIdentity(entry.get('worldMatrix')) else entry['worldMatrix']]
+            f.write((json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8'))
+
+    return path
+
+
+def iterHierarchy(presetFile):
+    """Stream entries of a hierarchy preset.
+
+    Compact presets are read line by line, json presets at once.
+
+    Args:
+        presetFile: String path to the preset file without an extension
+
+    Yields:
+        (object, entry) tuples in the same format as items of snapshotHierarchy output,
+        old presets have short names as keys and parents without transforms.
+    """
+
+    path = presetPath(presetFile)
+
+    if path.endswith(COMPACT_EXT):
+        with gzip.open(path, 'rb') as f:
+            f.readline()
+            for line in f:
+                obj, parent, index, matrix, worldMatrix = json.loads(line.decode('utf-8'))
+                yield obj, {'parent': parent, 'index': index,
+                            'matrix': matrix or IDENTITY, 'worldMatrix': worldMatrix or IDENTITY}
+        return
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    if data.get('version') == PRESET_VERSION:
+        for item in data['nodes'].items():
+            yield item
+    else:
+        # Old preset stores just {object: parent}
+        for obj, parent in data.items():
+            yield obj, {'parent': parent, 'index': None}
+
+
+def loadHierarchy(presetFile):
+    """Load a hierarchy preset, presets of an older version are converted.
+
+    Args:
+        presetFile: String path to the preset file without an extension
+
+    Returns:
+        A dict in the same format as an output of snapshotHierarchy, old presets
+        have short names as keys and parents without transforms.
+    """
+
+    return OrderedDict(iterHierarchy(presetFile))
+
+
+def storeHierarchy(presetFile, compact=False):
     """Store hierarchy into a json file.
 
-    Hierarchy is stored as a dictionary, where parent obj is a key
-    and group is a value.
+    Hierarchy is stored as a dictionary, where a long path of an obj is a key
+    and its parent, sibling index and transforms are a value.
     
     Args:
         presetFile: String path to the json file. For example:'/user_data/temp/temp'
+        compact: expect boolean if the hierarchy should be stored as gzipped records,
+            which are smaller and can be streamed, see writeCompact
         
     Returns:
         A stored dictionary. For example:
 
-        {"L_gun_ext_chasis_001__heavyDuty_metal_comp_geo": "L_gun_ext_chasis_001_grp", 
-         "L_arm_upperArm_panel_004_001__painted_metal_brown_comp_geo": "L_arm_upperArm_panel_004_grp", 
-         "C_head_panel_0008__painted_metal_brown_comp_geo": "C_head_grp"
+        {"|L_gun_ext_chasis_001_grp|L_gun_ext_chasis_001__heavyDuty_metal_comp_geo":
+            {"parent": "|L_gun_ext_chasis_001_grp", "index": 0, "matrix": [...], "worldMatrix": [...]},
+         "|C_head_panel_0008__painted_metal_brown_comp_geo":
+            {"parent": "world", "index": 2, "matrix": [...], "worldMatrix": [...]}
         }
     """
     
-    sel = cmds.ls(selection=True)
-    data = {}
+    data = snapshotHierarchy(cmds.ls(selection=True))
 
-    for obj in sel:
-        hasParent = bool(cmds.listRelatives(obj, parent=True))
-        if hasParent:    
-            parent = cmds.listRelatives(obj, parent=True)[0]
-        else:
-            parent = 'world'    
-               
-        data[obj] = parent
-
-    with open('%s.json' % presetFile, 'w') as f:
-        json.dump(data, f, indent=4)
+    # Preset in the other format is kept, presetPath reads the newer one
+    if compact:
+        writeCompact(presetFile, data)
+    else:
+        with open('%s.json' % presetFile, 'w') as f:
+            json.dump({'version': PRESET_VERSION, 'nodes': data}, f, indent=4)
         
     return data
-        
 
-def restoreHierarchy(presetFile):
+
+def matchEntries(objs, data):
+    """Match objects to preset entries by a long path or a unique short name.
+
+    Args:
+        objs: expect a list of long paths of scene objects
+        data: expect an output of loadHierarchy
+
+    Returns:
+        A list of (object, entry key) pairs, a list of objects missing in the preset
+        and a list of objects matching more than one entry.
+    """
+
+    shortNames = {}
+    for key in data:
+        shortNames.setdefault(key.rsplit('|', 1)[-1], []).append(key)
+
+    matches = []
+    missing = []
+    ambiguous = []
+
+    for obj in objs:
+        if obj in data:
+            matches.append((obj, obj))
+            continue
+
+        keys = shortNames.get(obj.rsplit('|', 1)[-1], [])
+        if len(keys) == 1:
+            matches.append((obj, keys[0]))
+        elif keys:
+            ambiguous.append(obj)
+        else:
+            missing.append(obj)
+
+    return matches, missing, ambiguous
+
+
+def resolveParents(parents):
+    """Find scene objects of stored parents.
+
+    Args:
+        parents: expect a list of stored parents, long paths or short names
+
+    Returns:
+        A dict with a stored parent as a key and a long path, WORLD or None as a value.
+    """
+
+    parents = list(parents)
+    # Long path first, then a unique short name if the path changed
+    found = resolveNames([parent for parent in parents if parent != WORLD])[0]
+
+    return dict((parent, WORLD if parent == WORLD else found.get(parent)) for parent in parents)
+
+
+def nodeHandle(path):
+    """Get a handle of a node which stays valid when the node is reparented or renamed."""
+
+    selList = om.MSelectionList()
+    selList.add(path)
+
+    return om.MObjectHandle(selList.getDependNode(0))
+
+
+def currentPath(handle):
+    """Get a current long path of a node tracked by a handle, None if the node was deleted."""
+
+    if not handle.isValid():
+        return None
+
+    return om.MDagPath.getAPathTo(handle.object()).fullPathName()
+
+
+def parentGrouped(groups):
+    """Parent objects with one parent call per target parent.
+
+    Paths of objects and parents are looked up right before each call,
+    so batches moving groups with other tracked objects inside do not
+    break the following ones.
+
+    Args:
+        groups: expect a list of (parent handle or WORLD, list of object handles) tuples
+
+    Returns:
+        A dict with a parent path as a key and current paths of its objects as a value
+        and a list of objects which could not be parented.
+    """
+
+    parented = OrderedDict()
+    failed = []
+
+    for parentHandle, handles in groups:
+        parent = WORLD if parentHandle == WORLD else currentPath(parentHandle)
+        paths = [path for path in (currentPath(handle) for handle in handles) if path]
+
+        if parent is None:
+            failed.extend(paths)
+            continue
+
+        # Skip objects which already are under the parent
+        objs = [path for path in paths if (path.rsplit('|', 1)[0] or WORLD) != parent]
+        if objs:
+            try:
+                if parent == WORLD:
+                    cmds.parent(objs, world=True)
+                else:
+                    cmds.parent(objs, parent)
+            except RuntimeError as e:
+                pm.warning("Objects could not be parented to %s: %s" % (parent, e))
+                failed.extend(objs)
+                continue
+
+        parented[parent] = [path for path in (currentPath(handle) for handle in handles) if path]
+
+    return parented, failed
+
+
+def restoreHierarchy(presetFile, transforms=False, order=False):
     """Restore hierarchy of selected objects from the json file.
 
-    Hierarchy restored from a dictonary in the json file.
+    Objects are grouped by their target parent, so every parent receives
+    all its children in a single parent call. Objects missing in the file
+    and parents missing in the scene are reported instead of failing.
     
     Args:
         presetFile: String path to the json file. For example:'/user_data/temp/temp'
+        transforms: expect boolean if stored local transforms should be applied
+        order: expect boolean if restored children should be sorted by their stored sibling index
         
     Returns:
-        A restored dictionary. For example:
+        A report dictionary. For example:
 
-        {"L_gun_ext_chasis_001__heavyDuty_metal_comp_geo": "L_gun_ext_chasis_001_grp", 
-         "L_arm_upperArm_panel_004_001__painted_metal_brown_comp_geo": "L_arm_upperArm_panel_004_grp", 
-         "C_head_panel_0008__painted_metal_brown_comp_geo": "C_head_grp"
-        }
+        {"restored": {"|C_head_grp": ["|C_head_grp|C_head_panel_0008__painted_metal_brown_comp_geo"]},
+         "missing": ["|pCube1"], "ambiguous": [], "missingParents": [], "failed": []}
     """
     
-    sel = cmds.ls(selection=True)
+    sel = cmds.ls(selection=True, long=True)
+    data = loadHierarchy(presetFile)
 
-    with open('%s.json' % presetFile, 'r') as f:
-        data = json.load(f)
+    matches, missing, ambiguous = matchEntries(sel, data)
+    parents = resolveParents(set(data[key]['parent'] for obj, key in matches))
 
-    for obj in sel:
-        if not data[obj] == 'world':
-            cmds.parent(obj, data[obj])
-    
-    return data
+    byParent = OrderedDict()
+    missingParents = []
+    for obj, key in matches:
+        parent = parents[data[key]['parent']]
+        if parent is None:
+            missingParents.append(obj)
+        else:
+            byParent.setdefault(parent, []).append((obj, key))
+
+    # Paths change with every parent call, nodes are tracked by handles instead
+    groups = [(WORLD if parent == WORLD else nodeHandle(parent), [(nodeHandle(obj), key) for obj, key in items])
+              for parent, items in byParent.items()]
+    restored, failed = parentGrouped([(parent, [handle for handle, key in items]) for parent, items in groups])
+
+    report = {'restored': restored, 'missing': missing, 'ambiguous': ambiguous, 'missingParents': missingParents,
+              'failed': failed}
+
+    for parent, items in groups:
+        items = [(currentPath(handle), key) for handle, key in items]
+        items = [(path, key) for path, key in items if path and path not in failed]
+
+        if transforms:
+            for path, key in items:
+                if data[key].get('matrix'):
+                    cmds.xform(path, matrix=data[key]['matrix'], objectSpace=True)
+
+        if order:
+            # Restored children are moved to the back in their stored order
+            for index, path in sorted((data[key]['index'], path) for path, key in items
+                                      if data[key].get('index') is not None):
+                cmds.reorder(path, back=True)
+
+    for key in ('missing', 'ambiguous', 'missingParents', 'failed'):
+        if report[key]:
+            pm.warning("%s objects skipped as %s: %s" % (len(report[key]), key, report[key]))
+
+    return report
         
-def selectGeos(presetFile):
+def _bareName(path):
+    """Get a short name of a path without namespaces."""
+    return path.rsplit('|', 1)[-1].rsplit(':', 1)[-1]
+
+
+def _barePath(path):
+    """Get a path without namespaces in any of its components."""
+    return '|'.join(name.rsplit(':', 1)[-1] for name in path.split('|'))
+
+
+def resolveNames(names, namespace=None):
+    """Find scene objects of stored names with two ls calls in total.
+
+    Names are looked up as they are first. Names which are not found are
+    looked up by their short name without namespaces in all namespaces,
+    so objects moved to another group or referenced under a different
+    namespace are still found. When more objects share a short name, the
+    one whose path ends the same way as the stored path wins.
+
+    Args:
+        names: expect a list of long paths or short names
+        namespace: expect a namespace candidates found by a short name have to be in,
+            e.g. 'assetA' or 'assetA:model'
+
+    Returns:
+        A dict with a stored name as a key and a long path as a value, a list of
+        unresolved names and a list of ambiguous names. For example:
+
+        ({'|C_head_grp|C_head_panel_0008__painted_metal_brown_comp_geo':
+             '|assetA:C_head_grp|assetA:C_head_panel_0008__painted_metal_brown_comp_geo'},
+         ['L_gun_ext_chasis_001__heavyDuty_metal_comp_geo'], [])
+    """
+
+    resolved = {}
+    unresolved = []
+    ambiguous = []
+
+    if not names:
+        return resolved, unresolved, ambiguous
+
+    # Exact lookup, short names may match more objects
+    found = cmds.ls(names, long=True) or []
+    foundSet = set(found)
+    byShort = {}
+    for path in found:
+        byShort.setdefault(path.rsplit('|', 1)[-1], []).append(path)
+
+    pending = []
+    for name in names:
+        if name.startswith('|'):
+            candidates = [name] if name in foundSet else []
+        else:
+            candidates = byShort.get(name, [])
+
+        if len(candidates) == 1:
+            resolved[name] = candidates[0]
+        else:
+            pending.append(name)
+
+    if not pending:
+        return resolved, unresolved, ambiguous
+
+    # Namespace aware lookup by a bare short name
+    bareNames = sorted(set(_bareName(name) for name in pending))
+    found = cmds.ls(bareNames, long=True, recursive=True) or []
+    byBare = {}
+    for path in found:
+        if namespace and not path.rsplit('|', 1)[-1].startswith('%s:' % namespace):
+            continue
+        byBare.setdefault(_bareName(path), []).append(path)
+
+    for name in pending:
+        candidates = byBare.get(_bareName(name), [])
+
+        if len(candidates) > 1:
+            # Prefer candidates ending with the stored path
+            barePath = _barePath(name)
+            candidates = [path for path in candidates if _barePath(path).endswith(barePath)] or candidates
+
+        if len(candidates) == 1:
+            resolved[name] = candidates[0]
+        elif candidates:
+            ambiguous.append(name)
+        else:
+            unresolved.append(name)
+
+    return resolved, unresolved, ambiguous
+
+
+def selectGeos(presetFile, namespace=None):
     """Select objects stored in the json file.
 
-    Select objects from a dictonary in the json file (keys).
+    Select objects from a dictonary in the json file (keys). Objects are
+    looked up by resolveNames, so only stored names are queried instead
+    of the whole scene.
     
     Args:
         presetFile: String path to the json file. For example:'/user_data/temp/temp'
+        namespace: expect a namespace objects should be searched in, e.g. 'assetA'
         
     Returns:
-        A list of restored objects. For example:
+        A list of selected objects. For example:
 
-        [u'C_head_panel_0008__painted_metal_brown_comp_geo', 
-         u'L_arm_upperArm_panel_004_001__painted_metal_brown_comp_geo',
-         u'L_gun_ext_chasis_001__heavyDuty_metal_comp_geo']
+        [u'|C_head_grp|C_head_panel_0008__painted_metal_brown_comp_geo', 
+         u'|L_arm_grp|L_arm_upperArm_panel_004_001__painted_metal_brown_comp_geo',
+         u'|L_gun_grp|L_gun_ext_chasis_001__heavyDuty_metal_comp_geo']
     """
 
-    with open('%s.json' % presetFile, 'r') as f:
-        data = (json.load(f)).keys()
-	
-	selectable = []
-	scene = cmds.ls()
+    data = [obj for obj, entry in iterHierarchy(presetFile)]
+    resolved, unresolved, ambiguous = resolveNames(data, namespace=namespace)
 
-    for obj in data:
-	    if obj in scene:
-		    selectable.append(obj)
-    
+    selectable = [resolved[obj] for obj in data if obj in resolved]
     cmds.select(selectable)
 
-    if data != selectable:
-        pm.warning("Not all geometries are present in the scene.")
+    if unresolved:
+        pm.warning("%s objects are not present in the scene: %s" % (len(unresolved), unresolved))
+    if ambiguous:
+        pm.warning("%s objects match more scene objects: %s" % (len(ambiguous), ambiguous))
     
-    return data
-    
-def mirrorHierarchy():
-    """Mirror hierarchy and rename new objects.
+    return selectable
     
+def diffHierarchy(presetFile, apply=False, namespace=None):
+    """Compare a hierarchy preset with the scene.
+
+    All stored objects and parents are resolved by resolveNames, objects
+    whose current parent differs from the stored one are reported and,
+    when applied, parented with one parent call per target parent.
+
     Args:
-        None
-        
+        presetFile: String path to the preset file. For example:'/user_data/temp/temp'
+        apply: expect boolean if changed parentings should be restored
+        namespace: expect a namespace objects should be searched in, e.g. 'assetA'
+
     Returns:
-        Nothing
+        A report dictionary. For example:
+
+        {"changed": [["|C_head_panel_0008__painted_metal_brown_comp_geo", "world", "|C_head_grp"]],
+         "unchanged": 1250, "unresolved": [], "ambiguous": [], "missingParents": []}
+
+        Applied diff adds "failed" with objects which could not be parented.
     """
+
+    data = loadHierarchy(presetFile)
+    resolved, unresolved, ambiguous = resolveNames(list(data.keys()), namespace=namespace)
+    parents = resolveParents(set(data[obj]['parent'] for obj in resolved))
+
+    report = {'changed': [], 'unchanged': 0, 'unresolved': unresolved, 'ambiguous': ambiguous,
+              'missingParents': []}
+    byParent = OrderedDict()
+
+    for obj in data:
+        path = resolved.get(obj)
+        if path is None:
+            continue
+
+        parent = parents[data[obj]['parent']]
+        current = path.rsplit('|', 1)[0] or WORLD
+        if parent is None:
+            report['missingParents'].append(obj)
+        elif parent == current:
+            report['unchanged'] += 1
+        else:
+            report['changed'].append([path, current, parent])
+            byParent.setdefault(parent, []).append(path)
+
+    if apply:
+        # Paths change with every parent call, nodes are tracked by handles instead
+        report['failed'] = parentGrouped([(WORLD if parent == WORLD else nodeHandle(parent),
+                                           [nodeHandle(path) for path in paths])
+                                          for parent, paths in byParent.items()])[1]
+
+    print '%s changed, %s unchanged, %s unresolved, %s ambiguous, %s missing parents' % (
+        len(report['changed']), report['unchanged'], len(unresolved), len(ambiguous), len(report['missingParents']))
+    return report
     
-    # Mirror axis
-    axis='X'
-    
-    # Duplicate selected objects
-    sel = cmds.ls(selection=True, o=1)
-    newObjects = cmds.duplicate(sel, renameChildren=True)
-    
-    # Delete history just in case
-    for obj in newObjects:
-        cmds.delete(constructionHistory=True)
+def mirrorHierarchy(axis='X', rules=jj_mirror.SIDE_RULES):
+    """Mirror hierarchy and rename new objects.
     
-    # Scale selected group    
-    cmds.setAttr('%s.scale%s' % (newObjects[0],axis), -1)
-               
-    for obj in newObjects:
-        # Rename R_ and L_ prefixes
-        if obj.startswith('R_'):
-            newName = obj.replace('R_', 'L_')
-        elif obj.startswith('L_'):
-            newName = obj.replace('L_', 'R_')
-        else:
-            newName = obj
+    Args:
+        axis: expect a mirror axis, 'X', 'Y' or 'Z'
+        rules: expect a list of (pattern, replacement) pairs swapping side tokens,
+            L_ and R_ prefixes by default
         
-        if newName.endswith('1'):
-            newName = newName[:-1]
-            
-        cmds.rename(obj, newName)
+    Returns:
+        A list of new root objects.
+    """
     
-    # Freeze transforms
-    cmds.makeIdentity(apply=True, t=True, r=True, s=True, pn=True)
+    return jj_mirror.mirror(cmds.ls(selection=True, o=1), axis=axis, rules=rules)
     
 def sortSelection():
     """Alphabetically sort selected items in the outliner."""
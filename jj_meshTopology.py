@@ -0,0 +1,221 @@
+"""
+Topology fingerprints of polygonal meshes used for validating blend shape targets.
+
+A fingerprint consists of vertex count, face count and a hash of face-vertex connectivity,
+so meshes with the same vertex count but different topology are not treated as compatible.
+Fingerprints are cached per node and computed again when Maya reports a topology change of the
+mesh, e.g. an edge flip keeping all counts, or when the mesh's cheap topology counters (vertices,
+edges, faces, face-vertices) change. Cached meshes are forgotten once deleted and the whole cache
+is cleared on scene open and new scene.
+
+Vertex positions are written through vertex tweaks of the shape in a single undoable setAttr call.
+
+Author: Jan Jinda
+Email: janjinda@janjinda.com
+Version: 1.0.0
+"""
+
+import hashlib
+import sys
+
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+
+from array import array
+
+# MObjectHandle hash code as a key, (handle, topology counters, fingerprint) as a value
+_cache = {}
+# MObjectHandle hash code as a key, ids of callbacks watching the mesh as a value
+_callbacks = {}
+# Ids of scene open and new scene callbacks clearing the whole cache
+_sceneCallbacks = []
+
+def _toBytes(values):
+    """Returns raw bytes of an integer array, NumPy arrays included."""
+    if hasattr(values, 'astype'):
+        return values.astype('int32').tobytes()
+
+    values = array('i', values)
+    if sys.version_info[0] > 2:
+        return values.tobytes()
+
+    return values.tostring()
+
+
+def connectivityHash(faceCounts, faceVertices):
+    """Hash face-vertex connectivity.
+
+    Args:
+        faceCounts: number of vertices per face
+        faceVertices: vertex indices of all faces
+
+    Returns:
+        A hex digest string.
+    """
+    digest = hashlib.sha1()
+    digest.update(_toBytes(faceCounts))
+    digest.update(_toBytes(faceVertices))
+
+    return digest.hexdigest()
+
+
+def meshFn(geo):
+    """Get MFnMesh of a geometry.
+
+    Args:
+        geo: transform or shape name
+
+    Returns:
+        MFnMesh attached to the mesh shape.
+    """
+    selList = om.MSelectionList()
+    selList.add(geo)
+    dagPath = selList.getDagPath(0)
+    dagPath.extendToShape()
+
+    return om.MFnMesh(dagPath)
+
+
+def pointArray(points):
+    """Convert flat x, y, z coordinates to MPointArray.
+
+    Args:
+        points: flat NumPy or standard array of coordinates
+
+    Returns:
+        MPointArray usable by OpenMaya.
+    """
+    return om.MPointArray(list(zip(*[iter(points.tolist())] * 3)))
+
+
+def setMeshPoints(geo, points):
+    """Write all vertex positions of a geometry in a single undoable call.
+
+    MFnMesh.setPoints is not recorded by undo, so positions are written as vertex tweaks
+    of the shape, offset by tweaks it already has.
+
+    Args:
+        geo: transform or shape name
+        points: flat NumPy or standard array of object space coordinates
+
+    Returns:
+        The updated geometry.
+    """
+    fnMesh = meshFn(geo)
+    count = fnMesh.numVertices
+
+    if not count:
+        return geo
+
+    tweaksAttr = '%s.pnts[0:%s]' % (fnMesh.fullPathName(), count - 1)
+    current = [c for p in fnMesh.getPoints(om.MSpace.kObject) for c in (p.x, p.y, p.z)]
+    tweaks = [c for tweak in cmds.getAttr(tweaksAttr) for c in tweak]
+    values = [tweak + new - old for tweak, new, old in zip(tweaks, points.tolist(), current)]
+
+    cmds.setAttr(tweaksAttr, *values, type='float3')
+
+    return geo
+
+
+def _removeCallbacks(callbackIds):
+    """Remove message callbacks, ignoring the ones already gone with their nodes."""
+    for callbackId in callbackIds:
+        try:
+            om.MMessage.removeCallback(callbackId)
+        except RuntimeError:
+            pass
+
+
+def _topologyChanged(node, hashCode):
+    """Drop a cached fingerprint once topology of the mesh changes."""
+    _cache.pop(hashCode, None)
+
+
+def _meshRemoved(node, hashCode):
+    """Forget a deleted mesh, undone deletion registers it again with the next fingerprint."""
+    _cache.pop(hashCode, None)
+    _removeCallbacks(_callbacks.pop(hashCode, []))
+
+
+def _sceneChanged(clientData):
+    """Forget all meshes of the closed scene."""
+    clearCache()
+
+
+def _watch(node, hashCode):
+    """Register callbacks dropping a cached fingerprint of a mesh."""
+    if not _sceneCallbacks:
+        for message in (om.MSceneMessage.kBeforeOpen, om.MSceneMessage.kBeforeNew):
+            _sceneCallbacks.append(om.MSceneMessage.addCallback(message, _sceneChanged))
+
+    _callbacks[hashCode] = [om.MPolyMessage.addPolyTopologyChangedCallback(node, _topologyChanged, hashCode),
+                            om.MNodeMessage.addNodePreRemovalCallback(node, _meshRemoved, hashCode)]
+
+
+def fingerprint(geo, cache=True):
+    """Get topology fingerprint of a geometry.
+
+    Args:
+        geo: transform or shape name
+        cache: store the fingerprint for next calls, disable for temporary meshes
+
+    Returns:
+        A tuple (vertex count, face count, connectivity hash). For example:
+
+        (482, 480, '6f1ed002ab5595859014ebf0951522d9')
+    """
+    fnMesh = meshFn(geo)
+    counters = (fnMesh.numVertices, fnMesh.numEdges, fnMesh.numPolygons, fnMesh.numFaceVertices)
+    handle = om.MObjectHandle(fnMesh.object())
+    hashCode = handle.hashCode()
+
+    cached = _cache.get(hashCode)
+    if cached and cached[0] == handle and cached[1] == counters:
+        return cached[2]
+
+    faceCounts, faceVertices = fnMesh.getVertices()
+    result = (fnMesh.numVertices, fnMesh.numPolygons, connectivityHash(faceCounts, faceVertices))
+
+    if cache:
+        _cache[hashCode] = (handle, counters, result)
+        # Edge flips or spins keep all counters, so topology changes of the mesh are watched too
+        if hashCode not in _callbacks:
+            _watch(fnMesh.object(), hashCode)
+
+    return result
+
+
+def objFingerprint(objData):
+    """Get topology fingerprint of parsed OBJ data.
+
+    Args:
+        objData: jj_objIO.ObjData
+
+    Returns:
+        A tuple comparable with output of fingerprint.
+    """
+    return objData.numVertices(), objData.numFaces(), connectivityHash(objData.faceCounts, objData.faceVertices)
+
+
+def sameTopology(source, target, cacheSource=True):
+    """Check if two geometries share the same topology.
+
+    Args:
+        source: blend shape source geometry
+        target: blend shape target geometry
+        cacheSource: disable for temporary source meshes deleted right after
+
+    Returns:
+        True if vertex count, face count and connectivity match.
+    """
+    return fingerprint(source, cache=cacheSource) == fingerprint(target)
+
+
+def clearCache():
+    """Forget all cached fingerprints and stop watching their meshes."""
+    _cache.clear()
+
+    for callbackIds in _callbacks.values():
+        _removeCallbacks(callbackIds)
+
+    _callbacks.clear()
@@ -0,0 +1,143 @@
+"""
+Mirror engine shared by jj_hierarchy, jj_mirrorHierarchy and jj_bsToolkit.
+
+Selected hierarchies are duplicated in a single call, history of all duplicates is
+deleted at once, new names are computed up front from side-token rules and applied
+deepest-first in one pass.
+
+import jj_mirror
+jj_mirror.mirror(axis='X')
+jj_mirror.mirror(axis='Z', rules=[(r'_lf$', '_rt'), (r'_rt$', '_lf')])
+
+Author: Jan Jinda
+Email: janjinda@janjinda.com
+Version: 1.0.0
+"""
+
+# Usual imports
+import maya.cmds as cmds
+import re
+
+# Regular expression and replacement pairs, the first matching rule renames a node
+SIDE_RULES = ((r'^L_', 'R_'), (r'^R_', 'L_'))
+AXES = ('X', 'Y', 'Z')
+
+
+def mirrorName(name, rules=SIDE_RULES):
+    """Swap a side token of a name.
+
+    Args:
+        name: expect a short name
+        rules: expect a list of (pattern, replacement) pairs
+
+    Returns:
+        A mirrored name, the same name if no rule matches. For example: 'R_arm_upperArm_geo'
+    """
+
+    for pattern, replacement in rules:
+        newName, count = re.subn(pattern, replacement, name, count=1)
+        if count:
+            return newName
+
+    return name
+
+
+def mirrorMapping(originals, duplicates, rules=SIDE_RULES):
+    """Compute new names of all duplicated nodes from their originals.
+
+    Duplicated children get unique names from duplicate, e.g. L_arm_geo1, so
+    descendants of both hierarchies are listed and paired by their order.
+    Has to run before history deletion, which can remove some duplicated nodes.
+
+    Args:
+        originals: expect a list of long paths of duplicated roots
+        duplicates: expect a list of long paths of new roots in the same order
+
+    Returns:
+        A list of (long path of a duplicate, new short name) tuples, deepest nodes first,
+        so renaming in this order never invalidates paths which are still to be renamed.
+    """
+
+    mapping = []
+
+    for original, duplicate in zip(originals, duplicates):
+        originalNodes = [original] + (cmds.listRelatives(original, allDescendents=True, fullPath=True) or [])
+        duplicateNodes = [duplicate] + (cmds.listRelatives(duplicate, allDescendents=True, fullPath=True) or [])
+
+        if len(originalNodes) != len(duplicateNodes):
+            cmds.warning("Hierarchy of %s does not match its duplicate, only its root is renamed." % original)
+            originalNodes, duplicateNodes = originalNodes[:1], duplicateNodes[:1]
+
+        for path, newPath in zip(originalNodes, duplicateNodes):
+            mapping.append((newPath, mirrorName(path.rsplit('|', 1)[-1], rules)))
+
+    mapping.sort(key=lambda item: item[0].count('|'), reverse=True)
+
+    return mapping
+
+
+def mirrorable(objs):
+    """Filter objects mirror works with.
+
+    Args:
+        objs: expect a list of objects
+
+    Returns:
+        A list of unique long paths of transforms, in the order mirror returns their duplicates.
+    """
+
+    # Empty list would make ls return the whole scene
+    return cmds.ls(objs, long=True, type='transform') if objs else []
+
+
+def mirror(objs=None, axis='X', rules=SIDE_RULES, rename=True, freeze=True):
+    """Duplicate and mirror objects with their hierarchies.
+
+    Args:
+        objs: expect a list of objects, selection by default
+        axis: expect a mirror axis from AXES
+        rules: expect a list of (pattern, replacement) pairs swapping side tokens
+        rename: expect boolean if duplicates should get mirrored names of their originals,
+            otherwise names given by duplicate are kept
+        freeze: expect boolean if transforms of duplicates should be frozen
+
+    Returns:
+        A list of long paths of new root objects. For example:
+
+        [u'|R_arm_grp']
+    """
+
+    if axis not in AXES:
+        raise ValueError("Axis has to be one of %s, got %s" % (AXES, axis))
+
+    if objs is None:
+        objs = cmds.ls(selection=True)
+    originals = mirrorable(objs)
+    if not originals:
+        cmds.warning("Nothing to mirror.")
+        return []
+
+    # Duplicate once, new roots come first in the same order as originals
+    newNodes = cmds.duplicate(originals, renameChildren=True)
+    duplicates = [cmds.ls(node, long=True)[0] for node in newNodes[:len(originals)]]
+
+    mapping = mirrorMapping(originals, duplicates, rules) if rename else []
+
+    # Delete history once for the whole set
+    cmds.delete(duplicates, constructionHistory=True)
+
+    for duplicate in duplicates:
+        scale = cmds.getAttr('%s.scale%s' % (duplicate, axis))
+        cmds.setAttr('%s.scale%s' % (duplicate, axis), -scale)
+
+    if freeze:
+        cmds.makeIdentity(duplicates, apply=True, t=True, r=True, s=True, n=False, preserveNormals=True)
+
+    if not rename:
+        return duplicates
+
+    # Intermediate shapes of duplicates are gone with history
+    existing = set(cmds.ls([path for path, name in mapping], long=True))
+    renamed = dict((path, cmds.rename(path, name)) for path, name in mapping if path in existing)
+
+    return [cmds.ls(renamed[duplicate], long=True)[0] for duplicate in duplicates]
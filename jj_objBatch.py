@@ -0,0 +1,239 @@
+"""
+Command line entry point of JJ Obj Toolkit for batch conversion of OBJ files outside of a Maya session.
+
+A directory of OBJs is split between N mayapy worker processes. Every worker imports its OBJs one by one
+through jj_objToolkit.importObjs into an empty scene and saves the result as a Maya scene or a clean OBJ.
+The launcher itself does not import maya, so it can run from any Python interpreter on a farm node.
+
+python jj_objBatch.py /path/to/objs /path/to/output --workers 8 --format mb
+python jj_objBatch.py /path/to/objs /path/to/output --workers 8 --format obj --engine api --mayapy /usr/autodesk/maya/bin/mayapy
+
+"""
+
+__author__ = "Jan Jinda"
+__version__ = "1.1.0"
+__email__ = "janjinda@janjinda.com"
+__website__ = "http://janjinda.com"
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Output format as a key, Maya file type as a value, OBJ is written by jj_objToolkit.exportObjs
+FORMATS = {'mb': 'mayaBinary', 'ma': 'mayaAscii', 'obj': None}
+
+
+def findObjs(directory, recursive=False):
+    """Lists OBJ files in a directory
+        Parameters:
+            directory (str): directory to search
+            recursive (bool): search subdirectories too
+        Returns:
+            paths (list): sorted paths to OBJ files
+    """
+    paths = []
+
+    for root, dirs, files in os.walk(directory):
+        paths.extend(os.path.join(root, i) for i in files if i.lower().endswith('.obj'))
+        if not recursive:
+            break
+
+    return sorted(paths)
+
+
+def splitJobs(paths, workers):
+    """Splits files between workers so that each gets roughly the same amount of data,
+    the biggest files are assigned first, always to the least loaded worker
+        Parameters:
+            paths (list): paths to files
+            workers (int): number of workers
+        Returns:
+            jobs (list): list of paths per worker, empty lists are left out
+    """
+    jobs = [[] for i in range(max(1, workers))]
+    loads = [0] * len(jobs)
+
+    for path in sorted(paths, key=os.path.getsize, reverse=True):
+        index = loads.index(min(loads))
+        jobs[index].append(path)
+        loads[index] += os.path.getsize(path)
+
+    return [job for job in jobs if job]
+
+
+def mayapyExecutable(mayapy=None):
+    """Finds mayapy executable
+        Parameters:
+            mayapy (str): explicit path, returned as it is
+        Returns:
+            mayapy (str): path to mayapy, MAYA_LOCATION is used when set, otherwise mayapy on PATH
+    """
+    if mayapy:
+        return mayapy
+
+    executable = 'mayapy.exe' if sys.platform == 'win32' else 'mayapy'
+
+    if os.path.basename(sys.executable).lower() == executable:
+        return sys.executable
+
+    if os.environ.get('MAYA_LOCATION'):
+        return os.path.join(os.environ['MAYA_LOCATION'], 'bin', executable)
+
+    return executable
+
+
+def sameDirectory(dirA, dirB):
+    """Checks if two paths point to the same directory"""
+    return os.path.normcase(os.path.realpath(dirA)) == os.path.normcase(os.path.realpath(dirB))
+
+
+def convertFiles(paths, outDir, fileFormat='mb', engine='translator'):
+    """Converts OBJ files one by one, has to run in mayapy
+        Parameters:
+            paths (list): paths to OBJ files
+            outDir (str): output directory
+            fileFormat (str): one of FORMATS keys
+            engine (str): import and export engine passed to jj_objToolkit
+        Returns:
+            results (list): dictionaries with path, output, seconds and error per file
+    """
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    # Importing toolkit only after Maya is initialized
+    import maya.cmds as cmds
+    import jj_objToolkit
+
+    # OBJ translator is a plugin which mayapy does not load on its own
+    cmds.loadPlugin('objExport', quiet=True)
+
+    results = []
+
+    for path in paths:
+        start = time.time()
+        result = {'path': path, 'output': None, 'error': None}
+
+        try:
+            # Exported OBJ could overwrite its own source
+            if fileFormat == 'obj' and sameDirectory(outDir, os.path.dirname(path)):
+                raise ValueError('output directory is the source directory of %s' % path)
+
+            cmds.file(new=True, force=True)
+            newGeos, objGroup = jj_objToolkit.importObjs([path], engine=engine)
+
+            if fileFormat == 'obj':
+                jj_objToolkit.exportObjs(newGeos, outDir, force=True, prompt=False, engine=engine)
+                result['output'] = os.path.join(outDir, '%s.obj' % newGeos[0])
+            else:
+                output = os.path.join(outDir, '%s.%s' % (os.path.splitext(os.path.basename(path))[0], fileFormat))
+                cmds.file(rename=output)
+                cmds.file(save=True, type=FORMATS[fileFormat], force=True)
+                result['output'] = output
+
+        except Exception as e:
+            result['error'] = str(e)
+
+        result['seconds'] = time.time() - start
+        results.append(result)
+
+    return results
+
+
+def runWorkers(paths, outDir, workers=None, fileFormat='mb', engine='translator', mayapy=None):
+    """Fans files out to mayapy worker processes and waits for all of them
+        Parameters:
+            paths (list): paths to OBJ files
+            outDir (str): output directory
+            workers (int): number of mayapy processes, defaults to number of CPUs
+            fileFormat (str): one of FORMATS keys
+            engine (str): import and export engine passed to jj_objToolkit
+            mayapy (str): path to mayapy
+        Returns:
+            results (list): dictionaries with path, output, seconds and error per file
+    """
+    results = []
+    processes = []
+    tempDir = tempfile.mkdtemp(prefix='jj_objBatch_')
+
+    for index, job in enumerate(splitJobs(paths, workers or multiprocessing.cpu_count())):
+        jobFile = os.path.join(tempDir, 'job_%03d.json' % index)
+        resultFile = os.path.join(tempDir, 'result_%03d.json' % index)
+
+        with open(jobFile, 'w') as f:
+            json.dump(job, f)
+
+        cmd = [mayapyExecutable(mayapy), os.path.abspath(__file__), '--job', jobFile, '--result', resultFile,
+               '--format', fileFormat, '--engine', engine, os.path.dirname(job[0]), outDir]
+        processes.append((subprocess.Popen(cmd), job, resultFile))
+
+    for process, job, resultFile in processes:
+        process.wait()
+
+        if os.path.isfile(resultFile):
+            with open(resultFile, 'r') as f:
+                results.extend(json.load(f))
+        else:
+            # Worker crashed before writing results
+            results.extend({'path': path, 'output': None, 'seconds': 0,
+                            'error': 'worker exited with code %s' % process.returncode} for path in job)
+
+    return results
+
+
+def main(argv=None):
+    """Parses command line arguments and runs the conversion
+        Returns:
+            exitCode (int): 0 if all files were converted, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(description='Batch convert OBJ files with JJ Obj Toolkit in mayapy.')
+    parser.add_argument('source', help='directory with OBJ files')
+    parser.add_argument('output', help='output directory')
+    parser.add_argument('--workers', type=int, default=None, help='number of mayapy processes, all CPUs by default')
+    parser.add_argument('--format', dest='fileFormat', choices=sorted(FORMATS), default='mb', help='output format')
+    parser.add_argument('--engine', choices=['translator', 'api'], default='translator', help='OBJ engine')
+    parser.add_argument('--recursive', action='store_true', help='search subdirectories for OBJ files')
+    parser.add_argument('--mayapy', default=None, help='path to mayapy executable')
+    # Internal arguments used by worker processes
+    parser.add_argument('--job', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.fileFormat == 'obj' and not args.job and sameDirectory(args.source, args.output):
+        parser.error('output directory has to differ from the source directory when converting to obj')
+
+    if not os.path.isdir(args.output):
+        os.makedirs(args.output)
+
+    if args.job:
+        # Worker process, convert assigned files and store results for the launcher
+        with open(args.job, 'r') as f:
+            paths = json.load(f)
+
+        results = convertFiles(paths, args.output, fileFormat=args.fileFormat, engine=args.engine)
+
+        with open(args.result, 'w') as f:
+            json.dump(results, f)
+
+    else:
+        paths = findObjs(args.source, recursive=args.recursive)
+        start = time.time()
+        results = runWorkers(paths, args.output, workers=args.workers, fileFormat=args.fileFormat,
+                             engine=args.engine, mayapy=args.mayapy)
+
+        for result in results:
+            print('%-60s %7.3fs  %s' % (os.path.basename(result['path']), result['seconds'],
+                                        result['error'] or result['output']))
+        print('%s OBJs converted, %s failed in %.3fs.' % (len([i for i in results if not i['error']]),
+                                                         len([i for i in results if i['error']]),
+                                                         time.time() - start))
+
+    return 1 if [i for i in results if i['error']] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+On-disk manifest of imported OBJ files used by JJ Obj Toolkit to skip files which did not change
+since their last import. It does not import maya, nodes are stored as UUID strings.
+
+Every entry stores file size, modification time and content hash together with the import mode,
+nodes created by the import (replaced when the file changes) and target nodes (kept).
+
+import jj_objCache
+manifest = jj_objCache.ImportManifest('/path/to/manifest.json')
+if not manifest.isUnchanged('/path/to/file.obj', 'iBatch'):
+    manifest.record('/path/to/file.obj', 'iBatch', nodes=['4C0A3E3B-...'])
+manifest.save()
+
+"""
+
+__author__ = "Jan Jinda"
+__version__ = "1.1.0"
+__email__ = "janjinda@janjinda.com"
+__website__ = "http://janjinda.com"
+
+import hashlib
+import json
+import os
+import time
+
+# Entries not used for this many seconds are evicted
+MAX_AGE = 30 * 24 * 60 * 60
+# Maximum number of entries, least recently used ones are evicted first
+MAX_ENTRIES = 10000
+# Size of chunks read while hashing a file
+HASH_CHUNK = 1024 * 1024
+
+
+def fileHash(path):
+    """Hashes content of a file in chunks
+        Parameters:
+            path (str): path to a file
+        Returns:
+            digest (str): SHA1 hex digest of the file content
+    """
+    digest = hashlib.sha1()
+
+    with open(path, 'rb') as f:
+        chunk = f.read(HASH_CHUNK)
+        while chunk:
+            digest.update(chunk)
+            chunk = f.read(HASH_CHUNK)
+
+    return digest.hexdigest()
+
+
+class ImportManifest(object):
+    """Manifest of imported OBJ files stored as a json file"""
+
+    def __init__(self, path, maxAge=MAX_AGE, maxEntries=MAX_ENTRIES):
+
+        self.path = path
+        self.maxAge = maxAge
+        self.maxEntries = maxEntries
+        self.entries = {}
+
+        self.load()
+
+    @staticmethod
+    def key(filePath):
+        """Normalized absolute path used as an entry key"""
+        return os.path.normcase(os.path.abspath(filePath))
+
+    def load(self):
+        """Loads the manifest from disk, missing or broken file results in an empty manifest
+            Returns:
+                entries (dict): loaded entries
+        """
+        self.entries = {}
+
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                self.entries = {}
+
+        return self.entries
+
+    def save(self):
+        """Evicts old entries and writes the manifest to disk
+            Returns:
+                path (str): path to the manifest file
+        """
+        self.evict()
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        with open(self.path, 'w') as f:
+            json.dump(self.entries, f, indent=4, sort_keys=True)
+
+        return self.path
+
+    def entry(self, filePath):
+        """Returns stored entry of a file or None"""
+        return self.entries.get(self.key(filePath))
+
+    def isUnchanged(self, filePath, mode):
+        """Checks if a file is the same as when it was imported last time in the same mode,
+        content is hashed only when size matches but modification time does not
+            Parameters:
+                filePath (str): path to the OBJ file
+                mode (str): import mode, e.g. name of the import radio button
+            Returns:
+                unchanged (bool): True if the file can be skipped
+        """
+        entry = self.entry(filePath)
+
+        if not entry or entry['mode'] != mode or not os.path.isfile(filePath):
+            return False
+
+        stat = os.stat(filePath)
+        if entry['size'] != stat.st_size:
+            return False
+
+        if entry['mtime'] != stat.st_mtime:
+            if entry['hash'] != fileHash(filePath):
+                return False
+            # Touched but not modified, remember new time to skip hashing next time
+            entry['mtime'] = stat.st_mtime
+
+        entry['used'] = time.time()
+
+        return True
+
+    def record(self, filePath, mode, nodes=None, targets=None):
+        """Stores an imported file
+            Parameters:
+                filePath (str): path to the OBJ file
+                mode (str): import mode
+                nodes (list): UUIDs of nodes created by the import, replaced when the file changes
+                targets (list): UUIDs of existing nodes the import was applied on
+            Returns:
+                entry (dict): stored entry
+        """
+        stat = os.stat(filePath)
+        entry = {'mode': mode,
+                 'size': stat.st_size,
+                 'mtime': stat.st_mtime,
+                 'hash': fileHash(filePath),
+                 'nodes': list(nodes or []),
+                 'targets': list(targets or []),
+                 'used': time.time()}
+
+        self.entries[self.key(filePath)] = entry
+
+        return entry
+
+    def forget(self, filePath):
+        """Removes an entry of a file
+            Returns:
+                entry (dict): removed entry or None
+        """
+        return self.entries.pop(self.key(filePath), None)
+
+    def clear(self):
+        """Removes all entries"""
+        self.entries = {}
+
+    def evict(self):
+        """Removes entries of missing files, entries older than maxAge and least recently used
+        entries above maxEntries
+            Returns:
+                evicted (list): keys of removed entries
+        """
+        now = time.time()
+        evicted = [key for key, entry in self.entries.items()
+                   if not os.path.isfile(key) or now - entry.get('used', 0) > self.maxAge]
+
+        for key in evicted:
+            del self.entries[key]
+
+        if len(self.entries) > self.maxEntries:
+            byUse = sorted(self.entries, key=lambda k: self.entries[k].get('used', 0))
+            for key in byUse[:len(self.entries) - self.maxEntries]:
+                del self.entries[key]
+                evicted.append(key)
+
+        return evicted
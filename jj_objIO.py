@@ -0,0 +1,402 @@
+"""
+Pure Python streaming OBJ reader and writer used by JJ Obj Toolkit as an alternative to the Maya
+OBJ translator. It does not import maya, so it can run headless and be tested on any machine.
+
+Parsed geometry is stored in flat arrays. NumPy arrays are used when NumPy is available,
+otherwise arrays from the standard library array module are used.
+
+import jj_objIO
+objData = jj_objIO.readObj('/path/to/file.obj')
+jj_objIO.writeObj('/path/to/copy.obj', [objData])
+
+"""
+
+__author__ = "Jan Jinda"
+__version__ = "1.1.0"
+__email__ = "janjinda@janjinda.com"
+__website__ = "http://janjinda.com"
+
+import multiprocessing
+import os
+import re
+import time
+
+from array import array
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Number of lines collected before they are written to a file at once
+WRITE_CHUNK = 65536
+# File buffer size used for both reading and writing
+BUFFER_SIZE = 1024 * 1024
+
+
+class ObjData(object):
+    """Flat arrays describing a single polygonal mesh
+
+        points (array): x, y, z per vertex
+        uvs (array): u, v per texture coordinate
+        normals (array): x, y, z per normal
+        faceCounts (array): number of vertices per face
+        faceVertices (array): vertex index per face vertex
+        faceUVs (array): uv index per face vertex, -1 if face vertex has no uv
+        faceNormals (array): normal index per face vertex, -1 if face vertex has no normal
+        groups (list): (group name, index of a first face) pairs in order of appearance
+    """
+
+    def __init__(self, name=None):
+
+        self.name = name
+        self.points = array('d')
+        self.uvs = array('d')
+        self.normals = array('d')
+        self.faceCounts = array('i')
+        self.faceVertices = array('i')
+        self.faceUVs = array('i')
+        self.faceNormals = array('i')
+        self.groups = []
+
+    @classmethod
+    def fromLists(cls, name, points, faceCounts, faceVertices, uvs=None, faceUVs=None, normals=None,
+                  faceNormals=None):
+        """Creates ObjData from flat sequences, e.g. data queried from a Maya mesh
+            Returns:
+                objData (ObjData): new mesh data
+        """
+        objData = cls(name)
+        objData.points.extend(points)
+        objData.faceCounts.extend(faceCounts)
+        objData.faceVertices.extend(faceVertices)
+
+        if uvs is not None and faceUVs is not None:
+            objData.uvs.extend(uvs)
+            objData.faceUVs.extend(faceUVs)
+
+        if normals is not None and faceNormals is not None:
+            objData.normals.extend(normals)
+            objData.faceNormals.extend(faceNormals)
+
+        return objData
+
+    def numVertices(self):
+        return len(self.points) // 3
+
+    def numFaces(self):
+        return len(self.faceCounts)
+
+    def hasUVs(self):
+        """True if every face vertex has a texture coordinate"""
+        return len(self.faceUVs) == len(self.faceVertices) and len(self.faceUVs) > 0 and min(self.faceUVs) >= 0
+
+    def hasNormals(self):
+        """True if every face vertex has a normal"""
+        return len(self.faceNormals) == len(self.faceVertices) and len(self.faceNormals) > 0 and \
+            min(self.faceNormals) >= 0
+
+    def finalize(self):
+        """Converts all arrays to NumPy arrays if NumPy is available
+            Returns:
+                self (ObjData): the same object for chaining
+        """
+        if numpy is not None:
+            for attr in ('points', 'uvs', 'normals'):
+                setattr(self, attr, numpy.asarray(getattr(self, attr), dtype=numpy.float64))
+            for attr in ('faceCounts', 'faceVertices', 'faceUVs', 'faceNormals'):
+                setattr(self, attr, numpy.asarray(getattr(self, attr), dtype=numpy.int32))
+
+        return self
+
+
+def objName(path):
+    """Creates a Maya friendly name from an OBJ file path, the same way the toolkit always did
+        Parameters:
+            path (str): path to the OBJ file
+        Returns:
+            name (str): file name without extension with all special characters replaced
+    """
+    return re.sub('[^0-9a-zA-Z]', '_', os.path.basename(path)[0:-4])
+
+
+def _index(token, count):
+    """Converts one based and negative OBJ index to zero based one"""
+    if not token:
+        return -1
+
+    index = int(token)
+
+    return index - 1 if index > 0 else count + index
+
+
+def iterObj(path):
+    """Streams records from an OBJ file one by one without loading the whole file
+        Parameters:
+            path (str): path to the OBJ file
+        Yields:
+            record (tuple): one of
+                            ('v', (x, y, z))
+                            ('vt', (u, v))
+                            ('vn', (x, y, z))
+                            ('f', ((vertex, uv, normal), ...)) zero based, -1 if missing
+                            ('g', name)
+    """
+    numV = numVT = numVN = 0
+
+    with open(path, 'r', BUFFER_SIZE) as f:
+        for line in f:
+            tokens = line.split()
+
+            if not tokens:
+                continue
+
+            tag = tokens[0]
+
+            if tag == 'v':
+                numV += 1
+                yield 'v', (float(tokens[1]), float(tokens[2]), float(tokens[3]))
+
+            elif tag == 'vt':
+                numVT += 1
+                yield 'vt', (float(tokens[1]), float(tokens[2]) if len(tokens) > 2 else 0.0)
+
+            elif tag == 'vn':
+                numVN += 1
+                yield 'vn', (float(tokens[1]), float(tokens[2]), float(tokens[3]))
+
+            elif tag == 'f':
+                face = []
+                for token in tokens[1:]:
+                    parts = token.split('/')
+                    face.append((_index(parts[0], numV),
+                                 _index(parts[1], numVT) if len(parts) > 1 else -1,
+                                 _index(parts[2], numVN) if len(parts) > 2 else -1))
+                yield 'f', tuple(face)
+
+            elif tag in ('g', 'o'):
+                yield 'g', ' '.join(tokens[1:]) or 'default'
+
+
+def readObj(path, name=None):
+    """Reads the whole OBJ file into a single ObjData
+        Parameters:
+            path (str): path to the OBJ file
+            name (str): name of the mesh, derived from the file name if not given
+        Returns:
+            objData (ObjData): parsed mesh data
+    """
+    objData = ObjData(name or objName(path))
+
+    # Local references avoid attribute lookups in the hot loop
+    points = objData.points
+    uvs = objData.uvs
+    normals = objData.normals
+    faceCounts = objData.faceCounts
+    faceVertices = objData.faceVertices
+    faceUVs = objData.faceUVs
+    faceNormals = objData.faceNormals
+
+    for tag, data in iterObj(path):
+        if tag == 'v':
+            points.extend(data)
+        elif tag == 'f':
+            faceCounts.append(len(data))
+            for vertex, uv, normal in data:
+                faceVertices.append(vertex)
+                faceUVs.append(uv)
+                faceNormals.append(normal)
+        elif tag == 'vt':
+            uvs.extend(data)
+        elif tag == 'vn':
+            normals.extend(data)
+        elif tag == 'g':
+            objData.groups.append((data, len(faceCounts)))
+
+    return objData.finalize()
+
+
+def _readJob(path):
+    """Parses one OBJ file, top level so it can be sent to a process pool"""
+    start = time.time()
+    objData = readObj(path)
+
+    return path, objData, time.time() - start
+
+
+def readObjBatch(paths, workers=None, processes=True, callback=None):
+    """Parses many OBJ files concurrently
+        Parameters:
+            paths (list): paths to OBJ files
+            workers (int): number of workers, defaults to number of CPUs
+            processes (bool): parse in a process pool, threads are limited by GIL while parsing
+            callback (function): called on the calling thread after each parsed file as
+                                 callback(done, total, path, seconds)
+        Returns:
+            results (list): (path, ObjData, seconds) per file in order of paths
+    """
+    results = []
+    pool = None
+
+    if not paths:
+        return results
+
+    workers = min(workers or multiprocessing.cpu_count(), len(paths))
+
+    # Single worker does not need any pool
+    if workers == 1:
+        iterResults = (_readJob(path) for path in paths)
+    else:
+        pool = multiprocessing.Pool(workers) if processes else ThreadPool(workers)
+        iterResults = pool.imap(_readJob, paths)
+
+    try:
+        for result in iterResults:
+            results.append(result)
+            if callback:
+                callback(len(results), len(paths), result[0], result[2])
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    return results
+
+
+def _toList(values):
+    """Returns plain Python list from NumPy or standard arrays"""
+    return values.tolist()
+
+
+def _chunks(values, size):
+    """Splits a flat list into tuples of given size"""
+    return zip(*[iter(values)] * size)
+
+
+def writeObj(path, objDataList, uvs=True, normals=True, chunkSize=WRITE_CHUNK):
+    """Writes meshes into a single OBJ file, each mesh as a separate group
+        Parameters:
+            path (str): path to the OBJ file
+            objDataList (list): list of ObjData to write
+            uvs (bool): if texture coordinates should be written
+            normals (bool): if normals should be written
+            chunkSize (int): number of lines buffered before writing them at once
+        Returns:
+            path (str): path to the written file
+    """
+    lines = []
+    offsetV = offsetVT = offsetVN = 0
+
+    with open(path, 'w', BUFFER_SIZE) as f:
+
+        def flush():
+            f.write(''.join(lines))
+            del lines[:]
+
+        for objData in objDataList:
+            writeUVs = uvs and objData.hasUVs()
+            writeNormals = normals and objData.hasNormals()
+
+            lines.append('g %s\n' % (objData.name or 'default'))
+
+            for point in _chunks(_toList(objData.points), 3):
+                lines.append('v %.6f %.6f %.6f\n' % point)
+                if len(lines) >= chunkSize:
+                    flush()
+
+            if writeUVs:
+                for uv in _chunks(_toList(objData.uvs), 2):
+                    lines.append('vt %.6f %.6f\n' % uv)
+                    if len(lines) >= chunkSize:
+                        flush()
+
+            if writeNormals:
+                for normal in _chunks(_toList(objData.normals), 3):
+                    lines.append('vn %.6f %.6f %.6f\n' % normal)
+                    if len(lines) >= chunkSize:
+                        flush()
+
+            faceVertices = _toList(objData.faceVertices)
+            faceUVs = _toList(objData.faceUVs) if writeUVs else None
+            faceNormals = _toList(objData.faceNormals) if writeNormals else None
+            start = 0
+
+            for count in _toList(objData.faceCounts):
+                end = start + count
+                vertices = [str(v + 1 + offsetV) for v in faceVertices[start:end]]
+
+                if writeUVs and writeNormals:
+                    tokens = ['%s/%d/%d' % (v, t + 1 + offsetVT, n + 1 + offsetVN) for v, t, n in
+                              zip(vertices, faceUVs[start:end], faceNormals[start:end])]
+                elif writeUVs:
+                    tokens = ['%s/%d' % (v, t + 1 + offsetVT) for v, t in zip(vertices, faceUVs[start:end])]
+                elif writeNormals:
+                    tokens = ['%s//%d' % (v, n + 1 + offsetVN) for v, n in zip(vertices, faceNormals[start:end])]
+                else:
+                    tokens = vertices
+
+                lines.append('f %s\n' % ' '.join(tokens))
+                if len(lines) >= chunkSize:
+                    flush()
+
+                start = end
+
+            offsetV += objData.numVertices()
+            offsetVT += len(objData.uvs) // 2 if writeUVs else 0
+            offsetVN += len(objData.normals) // 3 if writeNormals else 0
+
+        flush()
+
+    return path
+
+
+def _writeJob(job):
+    """Writes one export job, top level so it can be sent to a process pool"""
+    path, objDataList = job
+    start = time.time()
+    writeObj(path, objDataList)
+
+    return path, time.time() - start
+
+
+def writeObjBatch(jobs, workers=None, processes=True):
+    """Writes many OBJ files concurrently
+        Parameters:
+            jobs (iterable): (path, list of ObjData) pairs, can be a generator extracting mesh data lazily,
+                             it is always consumed on the calling thread
+            workers (int): number of workers, defaults to number of CPUs
+            processes (bool): write in a process pool, threads are limited by GIL while formatting OBJ lines
+        Returns:
+            results (list): (path, seconds) per written file in order of jobs
+    """
+    workers = workers or multiprocessing.cpu_count()
+    if hasattr(jobs, '__len__'):
+        if not jobs:
+            return []
+        workers = min(workers, len(jobs))
+
+    # Single worker does not need any pool
+    if workers == 1:
+        return [_writeJob(job) for job in jobs]
+
+    pool = multiprocessing.Pool(workers) if processes else ThreadPool(workers)
+    # Only a few jobs wait for a worker, so mesh data of all files is never held at once
+    maxPending = workers * 2
+    pending = deque()
+    results = []
+
+    try:
+        for job in jobs:
+            pending.append(pool.apply_async(_writeJob, (job,)))
+            if len(pending) >= maxPending:
+                results.append(pending.popleft().get())
+
+        while pending:
+            results.append(pending.popleft().get())
+    finally:
+        pool.close()
+        pool.join()
+
+    return results
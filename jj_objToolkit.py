@@ -6,7 +6,8 @@ hierarchy, geometry UVs, shader assignments etc.
 Installation
 ============
 
-Copy jj_objToolkit.py from the zip file to your scripts folder. Usually at these locations ():
+Copy jj_objToolkit.py together with jj_objIO.py, jj_objUtils.py, jj_objCache.py, jj_meshTopology.py
+and jj_profiler.py from the zip file to your scripts folder. Usually at these locations ():
 
 Windows - \<user's directory>\My Documents/Maya\<version>\scripts
 MacOs - /Users/<user's directory>/Library/Preferences/Autodesk/maya/<version>/scripts
@@ -17,6 +18,11 @@ Run following script or make a shelf button with following script.
 import jj_objToolkit
 jj_objToolkit.showUI()
 
+Import and export cores importObjs, exportObjs and transferPoints do not query the UI, so they can be used
+from mayapy. Batch conversion of whole directories on a farm is available through jj_objBatch.py.
+
+python jj_objBatch.py /path/to/objs /path/to/output --workers 8 --format mb
+
 """
 
 __author__ = "Jan Jinda"
@@ -25,11 +31,46 @@ __documentation__ = "https://janjinda.artstation.com/pages/jj-obj-toolkit-doc"
 __email__ = "janjinda@janjinda.com"
 __website__ = "http://janjinda.com"
 
+import json
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
+import multiprocessing
+import os
 import re
+import sys
+import time
+
+import jj_meshTopology
+import jj_objCache
+import jj_objIO
+import jj_objUtils
+import jj_profiler
 
+from contextlib import contextmanager
 from functools import partial
 
+# Number of workers writing OBJ files in Batch export with Python OBJ engine, None uses all CPUs
+EXPORT_WORKERS = None
+# True writes OBJ files in mayapy processes, False in threads of the current process
+EXPORT_PROCESSES = True
+# Number of processes parsing OBJ files on import with Python OBJ engine, None uses all CPUs
+IMPORT_WORKERS = None
+# Maximum number of geometries deformed by a single blend shape node in grouped mode
+BS_GROUP_SIZE = 500
+# Path to the manifest of imported OBJs, None stores it in Maya user application directory
+MANIFEST_FILE = None
+# False disables undo queue during imports instead of wrapping them into a single undo chunk
+IMPORT_UNDO = True
+# Import modes whose deformers from a previous import of a changed OBJ are replaced
+REPLACED_MODES = ('iBSOnMultiple',)
+# Scene node storing numbering and history of OBJ imports
+REGISTRY_NODE = 'jj_objImportRegistry'
+
+# Manifest of imported OBJs, loaded on first use
+manifest = None
+# Geometries created by the last iGeo call as keys and their OBJ files as values
+importedFiles = {}
+
 
 def iMaster(*args):
     """Running import functions based on selected radio button
@@ -39,7 +80,8 @@ def iMaster(*args):
     importCmd = None
 
     if queryIRadio() == 'iBatch':
-        iGeo(4, False)
+        newGeos, objGroup = iGeo(4, False, engine=queryEngine(), cacheMode='iBatch')
+        recordImports('iBatch', [(importedFiles[i], [i], []) for i in newGeos])
         importCmd = 'iBatch'
 
     if queryIRadio() == 'iBSOnSingle':
@@ -47,21 +89,29 @@ def iMaster(*args):
         importCmd = 'iBSOnSingle'
 
     if queryIRadio() == 'iBSOnMultiple':
-        iBSOnMultiple()
+        # Blend shapes would be deleted with history anyway, points are transferred directly instead
+        if queryIChckB():
+            iPointsOnMultiple()
+        else:
+            iBSOnMultiple()
         importCmd = 'iBSOnMultiple'
 
     if queryIRadio() == 'iCombine':
-        iGeo(4, False)
+        iGeo(4, False, engine=queryEngine())
         importCmd = 'iCombine'
 
     return importCmd
 
 
-def iGeo(fileMode, dupCheck, *args):
-    """Main import function, removes all unnecessary nodes
+def iGeo(fileMode, dupCheck, engine='translator', cacheMode=None, *args):
+    """Main import function, opens a dialog and imports selected OBJs
         Parameters:
             dupCheck: (bool): if should check for duplicates
             fileMode (int): passes fileMode to a dialog function
+            engine (str): 'translator' imports through Maya OBJ translator,
+                          'api' parses OBJ with jj_objIO and builds mesh through OpenMaya
+            cacheMode (str): import mode used to skip OBJs unchanged since their last import,
+                             None imports all files
         Returns:
             newGeo (str): newly imported geometry
     """
@@ -73,77 +123,479 @@ def iGeo(fileMode, dupCheck, *args):
     # Open dialog and store it's output
     dialogOut = dialog(dupCheck=dupCheck, fileMode=fileMode, diaCaption="OBJ Import", okCaption="Import")
 
+    if dialogOut and cacheMode:
+        dialogOut = cachedFilter(dialogOut, cacheMode, force=queryForceChckB())
+
     if dialogOut:
+        newGeos, objGroup = importObjs(dialogOut, engine=engine, combine=queryIRadio() == 'iCombine')
 
-        for i in dialogOut:
+    return newGeos, objGroup
 
-            # Import command
-            selectedFiles = cmds.file(i, i=True, type="OBJ", ignoreVersion=True, renameAll=True,
-                                      mergeNamespacesOnClash=False, options="mo=0, lo=0", pr=True, returnNewNodes=True)
-            # Get file name create temp geo name
-            fileName = re.sub('[^0-9a-zA-Z]', '_', (i.split('/')[-1])[0:-4])
-            tempGeoName = fileName + "_polySurface1"
-
-            # Create list of a type of each node created on import
-            typeList = []
-            for ii in selectedFiles:
-                typeList.append(cmds.objectType(ii))
-
-            # Combine selection and type list
-            combineDict = dict(zip(selectedFiles, typeList))
-
-            # Find keys with chosen values and removes sufficient keys from the dictionary
-            for key in combineDict.keys():
-                exclusionType = ['transform', 'mesh', 'groupId']
-                if combineDict[key] in exclusionType:
-                    del combineDict[key]
-
-            # Delete all objects which remained in the dictionary
-            cmds.delete(combineDict.keys())
-
-            # Assign initialShadingGroup to imported object
-            cmds.sets(tempGeoName, forceElement='initialShadingGroup')
-            cmds.polySoftEdge(tempGeoName, angle=30)
-            cmds.delete(tempGeoName, constructionHistory=True)
-
-            # Rename all imported geometries based on filename
-            newGeo = ('%s' % fileName)
-
-            if newGeo not in cmds.ls():
-                newGeo = cmds.rename(tempGeoName, newGeo)
-                newGeos.append(newGeo)
-            else:
-                newGeo = cmds.rename(tempGeoName, ("%s_obj" % newGeo))
-                newGeos.append(newGeo)
 
-        # Check if OBJ_import group already exists
-        if not cmds.objExists('OBJ_import_*'):
-            num = 1
+class ImportTransaction(object):
+    """Wraps an import into a single undo chunk, or disables undo completely, and measures time
+    and Maya heap memory of its phases. With flush the undo queue is emptied at the end, so changes
+    made outside of undo can not be mixed with undoing earlier commands
+
+        with ImportTransaction('OBJ Import') as transaction:
+            with transaction.phase('parse'):
+                ...
+    """
+
+    def __init__(self, name, undo=True, flush=False):
+
+        self.name = name
+        self.undo = undo
+        self.flush = flush
+        self.undoState = None
+        self.report = []
+        self.peakMemory = 0
+
+    def __enter__(self):
+
+        if self.undo:
+            cmds.undoInfo(openChunk=True, chunkName=self.name)
         else:
-            # If group exists increment it's number
-            num = (int(cmds.ls('OBJ_import_*')[-1].split('_')[-2])) + 1
+            self.undoState = cmds.undoInfo(query=True, state=True)
+            cmds.undoInfo(stateWithoutFlush=False)
 
-        objGroup = cmds.group(name='OBJ_import_%s_grp' % ('%03d' % num), empty=True)
-        cmds.parent(newGeos, objGroup)
+        self.peakMemory = self.memory()
 
-        # Check if OBJs should be combined
-        if queryIRadio() == 'iCombine' and len(newGeos) > 1:
-            # Combine new geometries and parent result under OBJ_import_*_grp
-            combinedGeo = cmds.polyUnite(newGeos, mergeUVSets=True, name="%s_X" % newGeos[0])[0]
-            cmds.parent(combinedGeo, objGroup)
-            cmds.delete(constructionHistory=True)
-            cmds.rename(combinedGeo, combinedGeo[:-2])
+        return self
 
-            print "%s OBJs were imported and combined to single geometry." % len(newGeos),
+    def __exit__(self, excType, excValue, traceback):
 
+        if self.undo:
+            cmds.undoInfo(closeChunk=True)
         else:
-            print "%s OBJs were imported." % len(newGeos),
+            cmds.undoInfo(stateWithoutFlush=self.undoState)
+            if self.flush:
+                cmds.flushUndo()
+
+        self.printReport()
+
+        return False
+
+    @staticmethod
+    def memory():
+        """Returns Maya heap memory in megabytes, 0 if it can not be queried"""
+        try:
+            return cmds.memory(heapMemory=True, megaByte=True)
+        except (RuntimeError, TypeError):
+            return 0
+
+    @contextmanager
+    def phase(self, name):
+        """Measures time and memory of a block of code"""
+        start = time.time()
+
+        try:
+            with jj_profiler.phase(name):
+                yield
+        finally:
+            memory = self.memory()
+            self.peakMemory = max(self.peakMemory, memory)
+            self.report.append((name, time.time() - start, memory))
+
+    def printReport(self):
+        """Prints time and memory per phase
+            Returns:
+                report (str): printed report
+        """
+        lines = ['%-10s %8.3fs %10.1f MB' % phase for phase in self.report]
+        lines.append('%-10s %8.3fs %10.1f MB peak' % ('Total', sum(i[1] for i in self.report), self.peakMemory))
+        report = '\n'.join(lines)
+
+        print '\n%s' % report
+
+        return report
+
+
+@jj_profiler.profiled('import')
+def importObjs(paths, engine='translator', combine=False, undo=None):
+    """Import core without any UI queries, removes all unnecessary nodes, usable in mayapy
+        Parameters:
+            paths (list): paths to OBJ files
+            engine (str): 'translator' imports through Maya OBJ translator,
+                          'api' parses OBJ with jj_objIO and builds mesh through OpenMaya
+            combine (bool): combine all imported geometries to a single one
+            undo (bool): wrap the import into a single undo chunk, False disables undo,
+                         IMPORT_UNDO is used if not given. Meshes of 'api' engine are created
+                         outside of undo, so undo is always disabled and flushed for it
+        Returns:
+            newGeos (list): newly imported geometries
+            objGroup (str): OBJ_import_*_grp group holding imported geometries
+    """
+
+    # Empty variables as they are returned at the end
+    newGeos = []
+    objGroup = None
+    importedFiles.clear()
+
+    if not paths:
+        return newGeos, objGroup
+
+    undo = IMPORT_UNDO if undo is None else undo
+    # MFnMesh.create is not recorded by undo, undoing the rest would leave orphaned meshes
+    apiEngine = engine == 'api'
+
+    with ImportTransaction('OBJ Import', undo=undo and not apiEngine, flush=apiEngine) as transaction:
+        newGeos, objGroup = _importObjs(paths, engine, combine, transaction)
 
     return newGeos, objGroup
 
 
+def _importObjs(paths, engine, combine, transaction):
+    """Import phases of importObjs running inside of an ImportTransaction"""
+
+    newGeos = []
+
+    # Python OBJ engine parses all files up front in parallel, only mesh creation runs on main thread
+    parsed = {}
+    timings = []
+    if engine == 'api':
+        with transaction.phase('parse'):
+            parsed = parseObjFiles(paths)
+
+    with transaction.phase('build'):
+        for i in paths:
+            newGeos.append(_importObj(i, engine, parsed, timings))
+
+    # Shading, normals and history are handled with one command for all geometries
+    with transaction.phase('cleanup'):
+        cmds.sets(newGeos, forceElement='initialShadingGroup')
+        cmds.polySoftEdge(newGeos, angle=30)
+        cmds.delete(newGeos, constructionHistory=True)
+
+    with transaction.phase('group'):
+        objGroup = _groupImported(newGeos, combine)
+        registerImport(objGroup, paths, len(newGeos), engine)
+
+    if timings:
+        timingReport(timings)
+
+    return newGeos, objGroup
+
+
+def _importObj(i, engine, parsed, timings):
+    """Imports a single OBJ file and renames it based on the file name
+        Returns:
+            newGeo (str): newly imported geometry
+    """
+
+    # Get file name create temp geo name
+    fileName = jj_objIO.objName(i)
+    tempGeoName = fileName + "_polySurface1"
+
+    if engine == 'api':
+        # Build the mesh directly from parsed data, no extra nodes are created
+        objData, parseTime = parsed[i]
+        objData.name = tempGeoName
+        start = time.time()
+        tempGeoName = meshFromObj(objData)
+        timings.append((i, parseTime, time.time() - start))
+
+    else:
+        # Import command
+        with jj_profiler.phase('translate'):
+            selectedFiles = cmds.file(i, i=True, type="OBJ", ignoreVersion=True, renameAll=True,
+                                      mergeNamespacesOnClash=False, options="mo=0, lo=0", pr=True,
+                                      returnNewNodes=True)
+
+        # Only nodes of unwanted types are returned by ls, so no per node objectType call is needed
+        extraNodes = cmds.ls(selectedFiles, long=True)
+        keptNodes = cmds.ls(selectedFiles, type=['transform', 'mesh', 'groupId'], long=True)
+        extraNodes = list(set(extraNodes) - set(keptNodes))
+
+        # Delete all unwanted nodes at once
+        if extraNodes:
+            cmds.delete(extraNodes)
+
+    # Rename imported geometry based on filename, it has to happen right away as next OBJ may use the same
+    # temp name
+    newGeo = ('%s' % fileName)
+
+    with jj_profiler.phase('rename'):
+        if not cmds.objExists(newGeo):
+            newGeo = cmds.rename(tempGeoName, newGeo)
+        else:
+            newGeo = cmds.rename(tempGeoName, ("%s_obj" % newGeo))
+
+    importedFiles[newGeo] = i
+
+    return newGeo
+
+
+def _groupImported(newGeos, combine):
+    """Parents imported geometries under a new OBJ_import_*_grp in one call and combines them
+        Returns:
+            objGroup (str): name of a created group
+    """
+
+    # Group number is taken from the registry, no scene wide search is needed
+    num = nextImportNumber()
+
+    objGroup = cmds.group(name='OBJ_import_%s_grp' % ('%03d' % num), empty=True)
+    cmds.parent(newGeos, objGroup)
+
+    # Check if OBJs should be combined
+    if combine and len(newGeos) > 1:
+        # Combine new geometries and parent result under OBJ_import_*_grp
+        combinedGeo = cmds.polyUnite(newGeos, mergeUVSets=True, name="%s_X" % newGeos[0])[0]
+        cmds.parent(combinedGeo, objGroup)
+        cmds.delete(combinedGeo, constructionHistory=True)
+        cmds.rename(combinedGeo, combinedGeo[:-2])
+
+        print "%s OBJs were imported and combined to single geometry." % len(newGeos),
+
+    else:
+        print "%s OBJs were imported." % len(newGeos),
+
+    return objGroup
+
+
+def importRegistry():
+    """Finds or creates the scene node storing numbering and history of OBJ imports, scenes from
+    older versions are scanned once to continue their numbering
+        Returns:
+            registry (str): name of the registry node
+    """
+
+    if cmds.objExists(REGISTRY_NODE):
+        return REGISTRY_NODE
+
+    # Numeric maximum, lexical order of names would put OBJ_import_010_grp before OBJ_import_9_grp
+    numbers = [int(i.split('_')[-2]) for i in cmds.ls('OBJ_import_*_grp') or [] if i.split('_')[-2].isdigit()]
+
+    registry = cmds.createNode('network', name=REGISTRY_NODE, skipSelect=True)
+    cmds.addAttr(registry, longName='lastNumber', attributeType='long', defaultValue=0)
+    cmds.addAttr(registry, longName='history', dataType='string')
+    cmds.setAttr('%s.lastNumber' % registry, max(numbers) if numbers else 0)
+    cmds.setAttr('%s.history' % registry, '[]', type='string')
+
+    return registry
+
+
+def nextImportNumber():
+    """Reserves number of a next OBJ_import_*_grp
+        Returns:
+            num (int): reserved number
+    """
+
+    registry = importRegistry()
+    num = cmds.getAttr('%s.lastNumber' % registry) + 1
+    cmds.setAttr('%s.lastNumber' % registry, num)
+
+    return num
+
+
+def registerImport(objGroup, paths, count, engine):
+    """Appends an import to the registry history
+        Parameters:
+            objGroup (str): created OBJ_import_*_grp
+            paths (list): imported OBJ files
+            count (int): number of imported geometries
+            engine (str): used import engine
+        Returns:
+            record (dict): stored record
+    """
+
+    registry = importRegistry()
+    record = {'group': objGroup,
+              'files': list(paths),
+              'count': count,
+              'engine': engine,
+              'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+    history = importHistory()
+    history.append(record)
+    cmds.setAttr('%s.history' % registry, json.dumps(history), type='string')
+
+    return record
+
+
+def importHistory(objGroup=None):
+    """Queries history of OBJ imports in the scene, usable by other tools
+        Parameters:
+            objGroup (str): return just records of this group
+        Returns:
+            history (list): records with group, files, count, engine and time keys, oldest first
+    """
+
+    if not cmds.objExists(REGISTRY_NODE):
+        return []
+
+    history = json.loads(cmds.getAttr('%s.history' % REGISTRY_NODE) or '[]')
+
+    if objGroup:
+        history = [i for i in history if i['group'] == objGroup]
+
+    return history
+
+
+def reimportBatch(objGroup, engine=None):
+    """Imports again all OBJs of a previous import
+        Parameters:
+            objGroup (str): OBJ_import_*_grp of the previous import
+            engine (str): import engine, the originally used one if not given
+        Returns:
+            newGeos (list): newly imported geometries
+            objGroup (str): new OBJ_import_*_grp
+    """
+
+    history = importHistory(objGroup)
+
+    if not history:
+        cmds.warning("%s is not in the OBJ import history." % objGroup)
+        return [], None
+
+    record = history[-1]
+    paths = [i for i in record['files'] if os.path.isfile(i)]
+
+    if len(paths) < len(record['files']):
+        cmds.warning("Some OBJs of %s do not exist anymore." % objGroup)
+
+    return importObjs(paths, engine=engine or record['engine'])
+
+
+def importManifest():
+    """Loads manifest of imported OBJs on first use
+        Returns:
+            manifest (jj_objCache.ImportManifest): manifest shared by all imports
+    """
+
+    global manifest
+
+    if manifest is None:
+        manifestFile = MANIFEST_FILE or os.path.join(cmds.internalVar(userAppDir=True), 'jj_objToolkit_manifest.json')
+        manifest = jj_objCache.ImportManifest(manifestFile)
+
+    return manifest
+
+
+def cachedFilter(paths, mode, force=False):
+    """Removes OBJs unchanged since their last import in the same mode whose nodes still exist. Deformers
+    created by a previous import of all other OBJs in REPLACED_MODES are deleted so they are replaced,
+    imported geometries are never deleted as they may have been shaded, moved or reparented since
+        Parameters:
+            paths (list): paths to OBJ files
+            mode (str): import mode
+            force (bool): import all files again, nothing from previous imports is deleted
+        Returns:
+            toImport (list): paths which have to be imported
+    """
+
+    cache = importManifest()
+    toImport = []
+    staleNodes = []
+
+    for path in paths:
+        entry = cache.entry(path)
+
+        if entry and entry['mode'] == mode and not force:
+            recorded = entry['nodes'] + entry['targets']
+            existing = cmds.ls(recorded) if recorded else []
+
+            if len(existing) == len(recorded) and cache.isUnchanged(path, mode):
+                continue
+
+            if entry['nodes'] and mode in REPLACED_MODES:
+                staleNodes.extend(cmds.ls(entry['nodes']) or [])
+
+        toImport.append(path)
+
+    if staleNodes:
+        cmds.delete(staleNodes)
+
+    if len(toImport) < len(paths):
+        print "%s OBJs unchanged since last import, skipped." % (len(paths) - len(toImport)),
+
+    return toImport
+
+
+def recordImports(mode, records):
+    """Stores imported OBJs in the manifest
+        Parameters:
+            mode (str): import mode
+            records (list): (OBJ path, created nodes, target nodes) per imported file
+        Returns:
+            manifest (jj_objCache.ImportManifest): updated manifest
+    """
+
+    cache = importManifest()
+
+    for path, nodes, targets in records:
+        cache.record(path, mode, nodes=cmds.ls(nodes, uuid=True) if nodes else [],
+                     targets=cmds.ls(targets, uuid=True) if targets else [])
+
+    if records:
+        cache.save()
+
+    return cache
+
+
+def useMayapy():
+    """Makes spawned worker processes run mayapy, not Maya GUI executable"""
+
+    if sys.platform == 'win32' and os.environ.get('MAYA_LOCATION'):
+        multiprocessing.set_executable(os.path.join(os.environ['MAYA_LOCATION'], 'bin', 'mayapy.exe'))
+
+
+def parseObjFiles(paths):
+    """Parses OBJ files in a process pool while showing progress
+        Parameters:
+            paths (list): paths to OBJ files
+        Returns:
+            parsed (dict): path as a key, (jj_objIO.ObjData, parse seconds) as a value
+    """
+
+    useMayapy()
+
+    # Progress window is not available in batch mode
+    interactive = not cmds.about(batch=True)
+
+    if interactive:
+        cmds.progressWindow(title='OBJ Import', progress=0, maxValue=len(paths), status='Parsing OBJs',
+                            isInterruptable=False)
+
+    def progress(done, total, path, seconds):
+        if interactive:
+            cmds.progressWindow(edit=True, progress=done, status='Parsed %s/%s' % (done, total))
+
+    try:
+        results = jj_objIO.readObjBatch(paths, workers=IMPORT_WORKERS, callback=progress)
+    finally:
+        if interactive:
+            cmds.progressWindow(endProgress=True)
+
+    parsed = {}
+    for path, objData, seconds in results:
+        parsed[path] = (objData, seconds)
+
+    return parsed
+
+
+def timingReport(timings):
+    """Prints per file timing of an import
+        Parameters:
+            timings (list): (path, parse seconds, build seconds) per file
+        Returns:
+            report (str): printed report
+    """
+
+    lines = ['%-60s parse %7.3fs  build %7.3fs' % (os.path.basename(path), parseTime, buildTime)
+             for path, parseTime, buildTime in timings]
+    lines.append('%-60s parse %7.3fs  build %7.3fs' % ('Total', sum(t[1] for t in timings),
+                                                       sum(t[2] for t in timings)))
+    report = '\n'.join(lines)
+
+    print '\n%s' % report
+
+    return report
+
+
 def eGeo(*args):
-    """Main export function
+    """Main export function, opens a dialog and exports selected geometries
         Returns:
             validGeos (list): list of all exported geometries
     """
@@ -161,12 +613,7 @@ def eGeo(*args):
             diaCaption = 'Batch'
 
         # Check Force overwrite checkbox
-        if queryEChckB()[0]:
-            pmt = False
-            force = True
-        else:
-            pmt = True
-            force = False
+        force = queryEChckB()[0]
 
         # Check Ignore duplicate geo checkbox
         if queryEChckB()[1]:
@@ -178,58 +625,114 @@ def eGeo(*args):
         dialogOut = dialog(dupCheck=dupCheck, fileMode=2, diaCaption="%s OBJ Export" % diaCaption, okCaption="Export")
 
         if dialogOut:
-            dialogOut = dialogOut[0]
+            validGeos = exportObjs(selection, dialogOut[0], combined=queryERadio() == 'eCombine', force=force,
+                                   engine=queryEngine())
 
-            # Run duplicateCheck and store into variables        
-            duplicateExists, duplicateMeshes = duplicateCheck()
+            cmds.select(validGeos, replace=True)
 
-            for i in selection:
-                # Store transforms of all selected geometries
-                allMeshes = cmds.listRelatives(cmds.listRelatives(i, allDescendents=True, type='mesh', path=True),
-                                               parent=True, fullPath=True)
+    else:
+        cmds.warning("Nothing selected."),
 
-                # List valid geometries
-                for ii in allMeshes:
-                    # Storing long name in case there are duplicates
-                    validGeos.append(ii)
+    return validGeos
 
-            # Check if just single file should be exported
-            if queryERadio() == 'eCombine':
-                # Single export
-                i = validGeos[0].replace('|', '_')[1:]
 
-                cmds.file('%s/%s.%s' % (dialogOut, i, 'obj'), force=False,
-                          options='groups=1;ptgroups=1;materials=0;smoothing=1;normals=1',
-                          type='OBJexport', es=True, pmt=pmt, f=force)
+@jj_profiler.profiled('export')
+def exportObjs(geos, outDir, combined=False, force=False, prompt=True, engine='translator', workers=None,
+               processes=None):
+    """Export core without any UI queries, usable in mayapy
+        Parameters:
+            geos (list): geometries or groups, all meshes under them are exported
+            outDir (str): directory for OBJ files
+            combined (bool): export all geometries to a single OBJ
+            force (bool): overwrite existing files
+            prompt (bool): ask before overwriting existing files, when False they are skipped unless forced
+            engine (str): 'translator' exports through Maya OBJ translator,
+                          'api' reads meshes through OpenMaya and writes them with jj_objIO
+            workers (int): number of workers writing OBJs with 'api' engine, EXPORT_WORKERS by default
+            processes (bool): write OBJs in mayapy processes instead of threads, EXPORT_PROCESSES by default
+        Returns:
+            validGeos (list): list of all exported geometries
+    """
 
-                print ('%s geometries exported to single OBJ.' % len(validGeos)),
+    validGeos = []
 
-            else:
+    # Run duplicateCheck and store into variables
+    duplicateExists, duplicateMeshes = duplicateCheck()
 
-                # Batch export
-                for i in validGeos:
-                    cmds.select(i, replace=True)
+    for i in geos:
+        # Store transforms of all given geometries
+        allMeshes = cmds.listRelatives(cmds.listRelatives(i, allDescendents=True, type='mesh', path=True),
+                                       parent=True, fullPath=True)
 
-                    if duplicateExists and i.split('|')[-1] in duplicateMeshes:
-                        i = i.replace('|', '_')[1:]
+        # List valid geometries
+        for ii in allMeshes or []:
+            # Storing long name in case there are duplicates
+            validGeos.append(ii)
 
-                    else:
-                        i = i.split('|')[-1]
+    if not validGeos:
+        return validGeos
 
-                    cmds.file('%s/%s.%s' % (dialogOut, i, 'obj'), force=False,
-                              options='groups=1;ptgroups=1;materials=0;smoothing=1;normals=1',
-                              type='OBJexport', es=True, pmt=pmt, f=force)
+    # Check if just single file should be exported
+    if combined:
+        # Single export
+        i = validGeos[0].replace('|', '_')[1:]
+        filePath = '%s/%s.%s' % (outDir, i, 'obj')
 
-                print ('%s geometries exported to OBJs.' % len(validGeos)),
+        if overwriteAllowed(filePath, force, prompt):
+            if engine == 'api':
+                jj_objIO.writeObj(filePath, [objFromMesh(ii) for ii in validGeos])
+            else:
+                cmds.select(geos, replace=True)
+                cmds.file(filePath, force=False,
+                          options='groups=1;ptgroups=1;materials=0;smoothing=1;normals=1',
+                          type='OBJexport', es=True, pmt=False, f=True)
 
-            cmds.select(validGeos, replace=True)
+        print ('%s geometries exported to single OBJ.' % len(validGeos)),
 
     else:
-        cmds.warning("Nothing selected."),
+
+        # Batch export, Python OBJ engine extracts meshes lazily while workers write previous ones
+        def filePaths():
+            for i in validGeos:
+                geo = i
+
+                if duplicateExists and i.split('|')[-1] in duplicateMeshes:
+                    i = i.replace('|', '_')[1:]
+
+                else:
+                    i = i.split('|')[-1]
+
+                filePath = '%s/%s.%s' % (outDir, i, 'obj')
+
+                # Overwrite prompt has to run on the main thread
+                if overwriteAllowed(filePath, force, prompt):
+                    yield geo, filePath
+
+        def exportJobs():
+            for geo, filePath in filePaths():
+                with jj_profiler.phase('extract'):
+                    objData = objFromMesh(geo)
+                yield filePath, [objData]
+
+        if engine == 'api':
+            useMayapy()
+            with jj_profiler.phase('write'):
+                jj_objIO.writeObjBatch(exportJobs(), workers=workers or EXPORT_WORKERS,
+                                       processes=EXPORT_PROCESSES if processes is None else processes)
+        else:
+            for geo, filePath in filePaths():
+                with jj_profiler.phase('translate'):
+                    cmds.select(geo, replace=True)
+                    cmds.file(filePath, force=False,
+                              options='groups=1;ptgroups=1;materials=0;smoothing=1;normals=1',
+                              type='OBJexport', es=True, pmt=False, f=True)
+
+        print ('%s geometries exported to OBJs.' % len(validGeos)),
 
     return validGeos
 
 
+@jj_profiler.profiled()
 def iBSOnSingle(*args):
     """Importing OBJs as blend shape targets on one selected geometry
         Returns:
@@ -248,18 +751,20 @@ def iBSOnSingle(*args):
     # Find if one geometry is selected
     if len(origGeos) == 1:
         # Run iGeo function
-        newGeos, objGroup = iGeo(4, True)
+        newGeos, objGroup = iGeo(4, True, engine=queryEngine())
         target = origGeos[0]
         if newGeos:
-            # Define source and target for a blend shape
+            # Define source and target for a blend shape, target fingerprint is computed just once
+            targetTopology = jj_meshTopology.fingerprint(target)
             for i in newGeos:
-                if cmds.polyEvaluate(i, v=True) == cmds.polyEvaluate(target, v=True):
+                if jj_meshTopology.fingerprint(i, cache=False) == targetTopology:
                     validGeos.append(i)
 
-            # Check if source and target have same vertex count
+            # Check if source and target have same topology
             if validGeos:
                 validGeos.append(target)
-                bS = cmds.blendShape(validGeos)
+                with jj_profiler.phase('blendShape'):
+                    bS = cmds.blendShape(validGeos)
                 bSList.append(bS)
 
                 cmds.delete(validGeos[:-1])
@@ -275,6 +780,7 @@ def iBSOnSingle(*args):
     return newGeos, bSList
 
 
+@jj_profiler.profiled()
 def iBSOnMultiple(*args):
     """Importing multiple OBJs as a blend shape to an existing corresponding geometries
         Returns:
@@ -283,40 +789,48 @@ def iBSOnMultiple(*args):
             bSCtrlLoc(str): name of a created blend shapes controller
     """
 
-    # Empty variables as they are returned at the end, import OBJs and store all geometries in the scene
-    sceneGeos = [i.encode('UTF8') for i in cmds.listRelatives(cmds.ls(type='mesh'), parent=True)]
+    # Empty variables as they are returned at the end, index all geometries in the scene before import
+    sceneGeos = jj_objUtils.lowerNameIndex(
+        jj_objUtils.parentPaths(cmds.ls(type='mesh', long=True, noIntermediate=True) or []))
     validGeos = []
-    newGeos, objGroup = iGeo(4, True)
+    groupBS = queryGroupBSChckB()
+    # Shared deformers of grouped mode can not be replaced per file, so they are not cached
+    newGeos, objGroup = iGeo(4, True, engine=queryEngine(), cacheMode=None if groupBS else 'iBSOnMultiple')
     nonBS = []
     bSList = []
     bSCtrlLoc = None
 
-    # Convert lists to dictionary with matching lowercase names
-    sceneGeos = {i: i.lower() for i in sceneGeos}
-
     if newGeos:
-        for source in newGeos:
-            sourceLwr = source.lower()
-            sourceLwr = sourceLwr.encode('UTF8')
-            targetLwr = sourceLwr.replace('_obj', '')
-
-            # Check if imported OBJ name matches with any geometry in the scene
-            if targetLwr in sceneGeos.values():
-                target = sceneGeos.keys()[sceneGeos.values().index(targetLwr)]
+        # Match imported OBJ names with geometries in the scene
+        matches, unmatched, ambiguous = jj_objUtils.matchNames(newGeos, sceneGeos)
+        nonBS.extend(unmatched)
+        nonBS.extend(ambiguous)
+
+        validPairs = []
+        for source, target in matches:
+            # Check if source and target have same topology
+            if jj_meshTopology.sameTopology(source, target, cacheSource=False):
+                validGeos.append(target)
+                validPairs.append((source, target))
 
-                # Check if source and target have same vertex count
-                if cmds.polyEvaluate(source, v=True) == cmds.polyEvaluate(target, v=True):
-                    validGeos.append(target)
+            else:
+                nonBS.append(source)
 
-                    # Create a blend shape
+        # Create blend shapes, either a single deformer per geometry or few deformers shared by many geometries
+        with jj_profiler.phase('blendShape'):
+            if groupBS:
+                bSList = bSCreateGrouped(validPairs)
+            else:
+                records = []
+                for source, target in validPairs:
                     bS = bSCreate(source=source, target=target)
                     bSList.append(bS)
+                    records.append((importedFiles[source], [bS], [target]))
 
-                else:
-                    nonBS.append(source)
+                recordImports('iBSOnMultiple', records)
 
-            else:
-                nonBS.append(source)
+        if ambiguous:
+            cmds.warning("Multiple scene geometries match these OBJs, they were skipped. %s" % ambiguous)
 
         # Create a locator
         if bSList:
@@ -327,13 +841,253 @@ def iBSOnMultiple(*args):
 
         if not queryIChckB():
             print "%s OBJs imported. %s OBJs blend shaped. bs_ctrl created." % \
-                  (len(newGeos), len(bSList)),
+                  (len(newGeos), len(validGeos)),
         else:
-            print "%s OBJs imported. %s OBJs blend shaped. History deleted." % (len(newGeos), len(bSList)),
+            print "%s OBJs imported. %s OBJs blend shaped. History deleted." % (len(newGeos), len(validGeos)),
 
     return newGeos, objGroup, bSList, bSCtrlLoc
 
 
+def iPointsOnMultiple(*args):
+    """Importing OBJ vertex positions directly onto corresponding geometries without any deformer
+        Returns:
+            updatedGeos (list): list of all geometries with transferred points
+            nonMatching (list): list of OBJ names without a matching geometry or topology
+    """
+
+    # Empty variables as they are returned at the end
+    updatedGeos = []
+    nonMatching = []
+
+    dialogOut = dialog(dupCheck=True, fileMode=4, diaCaption="OBJ Import", okCaption="Import")
+
+    if dialogOut:
+        dialogOut = cachedFilter(dialogOut, 'iPointsOnMultiple', force=queryForceChckB())
+
+    if dialogOut:
+        updatedGeos, nonMatching, newGeos = transferPoints(dialogOut, engine=queryEngine())
+
+    return updatedGeos, nonMatching
+
+
+@jj_profiler.profiled()
+def transferPoints(paths, engine='translator', importUnmatched=True):
+    """Point transfer core without any UI queries, usable in mayapy, undone in a single step
+        Parameters:
+            paths (list): paths to OBJ files
+            engine (str): engine importing OBJs without a matching geometry or topology
+            importUnmatched (bool): import OBJs without a matching geometry or topology into
+                                    OBJ_import_*_grp, as blend shape import does
+        Returns:
+            updatedGeos (list): list of all geometries with transferred points
+            nonMatching (list): list of OBJ names without a matching geometry or topology
+            newGeos (list): list of imported geometries of non matching OBJs
+    """
+
+    # Empty variables as they are returned at the end, index all geometries in the scene
+    sceneGeos = jj_objUtils.lowerNameIndex(
+        jj_objUtils.parentPaths(cmds.ls(type='mesh', long=True, noIntermediate=True) or []))
+    updatedGeos = []
+    nonMatching = []
+    newGeos = []
+
+    if not paths:
+        return updatedGeos, nonMatching, newGeos
+
+    with jj_profiler.phase('parse'):
+        parsed = parseObjFiles(paths)
+    objPaths = dict((jj_objIO.objName(i), i) for i in paths)
+
+    # Match OBJ names with geometries in the scene
+    matches, unmatched, ambiguous = jj_objUtils.matchNames(list(objPaths.keys()), sceneGeos)
+    nonMatching.extend(unmatched)
+    nonMatching.extend(ambiguous)
+
+    validPairs = []
+    records = []
+    for name, target in matches:
+        objData = parsed[objPaths[name]][0]
+
+        # Check if OBJ and target have same topology
+        if jj_meshTopology.objFingerprint(objData) == jj_meshTopology.fingerprint(target):
+            validPairs.append((objData, target))
+            records.append((objPaths[name], [], [target]))
+        else:
+            nonMatching.append(name)
+
+    updatedGeos = [target for objData, target in validPairs]
+
+    cmds.undoInfo(openChunk=True, chunkName='OBJ Points Transfer')
+    try:
+        # History is deleted in a single call first, so points are written straight into the shapes
+        if updatedGeos:
+            cmds.delete(updatedGeos, ch=True)
+
+        with jj_profiler.phase('setPoints'):
+            for objData, target in validPairs:
+                jj_meshTopology.setMeshPoints(target, objData.points)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    recordImports('iPointsOnMultiple', records)
+
+    if ambiguous:
+        cmds.warning("Multiple scene geometries match these OBJs, they were skipped. %s" % ambiguous)
+
+    if nonMatching and importUnmatched:
+        newGeos = importObjs([objPaths[i] for i in nonMatching], engine=engine)[0]
+    elif nonMatching:
+        cmds.warning("These OBJs have no matching geometry or topology, they were skipped. %s" % nonMatching)
+
+    print "%s OBJs parsed. Points transferred to %s geometries. History deleted. %s OBJs imported." % \
+          (len(paths), len(updatedGeos), len(newGeos)),
+
+    return updatedGeos, nonMatching, newGeos
+
+
+def benchmarkSpheres(pieces, subdivisions, name):
+    """Creates pairs of spheres where each source is a scaled copy of its target, used by benchmarks
+        Parameters:
+            pieces (int): number of pairs
+            subdivisions (int): subdivisions of each sphere
+            name (str): name of a group holding all spheres
+        Returns:
+            benchGrp (str): group holding all spheres, delete it after the benchmark
+            pairs (list): (source, target) pairs of partial paths
+    """
+
+    benchGrp = cmds.group(empty=True, name=name)
+    pairs = []
+
+    for i in range(pieces):
+        target = cmds.polySphere(subdivisionsX=subdivisions, subdivisionsY=subdivisions, ch=False)[0]
+        source = cmds.duplicate(target)[0]
+        cmds.scale(1.2, 1.2, 1.2, source)
+        cmds.makeIdentity(source, apply=True, s=True)
+        cmds.parent(target, source, benchGrp)
+        pairs.append(('%s|%s' % (benchGrp, source), '%s|%s' % (benchGrp, target)))
+
+    return benchGrp, pairs
+
+
+def benchmarkTransferPoints(pieces=1000, subdivisions=20):
+    """Compares point transfer with blend shape plus history deletion on a large batch
+        Parameters:
+            pieces (int): number of geometries to update
+            subdivisions (int): subdivisions of each test sphere
+        Returns:
+            results (dict): mode as a key, meshes per second as a value
+    """
+
+    results = {}
+
+    for mode in ('blendShape', 'transferPoints'):
+        benchGrp, pairs = benchmarkSpheres(pieces, subdivisions, 'pointsBenchmark_grp')
+
+        if mode == 'transferPoints':
+            # Parsed OBJ data is simulated by reading the source meshes up front
+            pairs = [(objFromMesh(source).points, target) for source, target in pairs]
+
+        start = time.time()
+        if mode == 'transferPoints':
+            cmds.delete([target for points, target in pairs], ch=True)
+            for points, target in pairs:
+                jj_meshTopology.setMeshPoints(target, points)
+        else:
+            for source, target in pairs:
+                bSCreate(source, target)
+            cmds.delete([target for source, target in pairs], ch=True)
+        elapsed = time.time() - start
+
+        cmds.delete(benchGrp)
+        results[mode] = pieces / elapsed if elapsed else float('inf')
+
+        print '%-15s %s meshes in %.3fs  %.1f meshes/sec' % (mode, pieces, elapsed, results[mode])
+
+    return results
+
+
+def meshFromObj(objData):
+    """Builds a mesh from parsed OBJ data through OpenMaya, bypassing the OBJ translator
+        Parameters:
+            objData (jj_objIO.ObjData): parsed OBJ data, its name is used for the new transform
+        Returns:
+            newGeo (str): name of a created transform
+    """
+
+    points = jj_meshTopology.pointArray(objData.points)
+    faceCounts = objData.faceCounts.tolist()
+    faceVertices = objData.faceVertices.tolist()
+
+    fnMesh = om.MFnMesh()
+
+    if objData.hasUVs():
+        uvs = objData.uvs.tolist()
+        meshObj = fnMesh.create(points, faceCounts, faceVertices, uvs[0::2], uvs[1::2])
+        fnMesh.assignUVs(faceCounts, objData.faceUVs.tolist())
+    else:
+        meshObj = fnMesh.create(points, faceCounts, faceVertices)
+
+    newGeo = om.MFnDagNode(meshObj).setName(objData.name)
+
+    return newGeo
+
+
+def objFromMesh(geo):
+    """Reads world space mesh data through OpenMaya for writing with jj_objIO
+        Parameters:
+            geo (str): geometry transform or shape
+        Returns:
+            objData (jj_objIO.ObjData): mesh data named after the geometry
+    """
+
+    selList = om.MSelectionList()
+    selList.add(geo)
+    dagPath = selList.getDagPath(0)
+    dagPath.extendToShape()
+    fnMesh = om.MFnMesh(dagPath)
+
+    points = [c for p in fnMesh.getPoints(om.MSpace.kWorld) for c in (p.x, p.y, p.z)]
+    faceCounts, faceVertices = fnMesh.getVertices()
+
+    # UVs are written only when every face vertex has one
+    us, vs = fnMesh.getUVs()
+    uvCounts, uvIds = fnMesh.getAssignedUVs()
+    uvs = [c for uv in zip(us, vs) for c in uv] if len(uvIds) == len(faceVertices) else None
+
+    normals = [c for n in fnMesh.getNormals(om.MSpace.kWorld) for c in (n.x, n.y, n.z)]
+    normalCounts, normalIds = fnMesh.getNormalIds()
+
+    objData = jj_objIO.ObjData.fromLists(geo.split('|')[-1], points, faceCounts, faceVertices,
+                                         uvs=uvs, faceUVs=uvIds if uvs else None,
+                                         normals=normals, faceNormals=normalIds)
+
+    return objData
+
+
+def overwriteAllowed(filePath, force, prompt=True):
+    """Checks if a file can be written, asks user when the file exists and overwrite is not forced
+        Parameters:
+            filePath (str): path to a file
+            force (bool): value of Force overwrite checkbox
+            prompt (bool): ask user, when False existing files are never overwritten without force
+        Returns:
+            allowed (bool): True if the file can be written
+    """
+
+    if force or not os.path.exists(filePath):
+        return True
+
+    if not prompt or cmds.about(batch=True):
+        cmds.warning("%s already exists, skipped." % filePath)
+        return False
+
+    answer = cmds.confirmDialog(title='Overwrite', message='%s already exists. Overwrite?' % filePath,
+                                button=['Yes', 'No'], defaultButton='No', cancelButton='No', dismissString='No')
+
+    return answer == 'Yes'
+
+
 def bSCreate(source, target):
     """Creates blend shape deformer
         Parameters:
@@ -345,12 +1099,92 @@ def bSCreate(source, target):
 
     # Create blend shape between source and target
     bS = cmds.blendShape(source, target)[0]
-    cmds.setAttr('%s.%s' % (bS, source), 1)
+    # Weight alias is a short name of the source, index works for paths too
+    cmds.setAttr('%s.weight[0]' % bS, 1)
     cmds.delete(source)
 
     return bS
 
 
+def bSCreateGrouped(pairs, groupSize=None):
+    """Creates blend shape deformers each deforming many geometries through a single weight
+        Parameters:
+            pairs (list): (source, target) pairs of blend shape geometries
+            groupSize (int): maximum number of geometries per deformer, BS_GROUP_SIZE if not given
+        Returns:
+            bSList (list): names of created blend shape deformers
+    """
+
+    bSList = []
+    groupSize = groupSize or BS_GROUP_SIZE
+
+    for start in range(0, len(pairs), groupSize):
+        group = pairs[start:start + groupSize]
+        targets = [target for source, target in group]
+
+        # One deformer for all targets in the group, every base gets its source at weight index 0
+        bS = cmds.deformer(targets, type='blendShape', name='bShape_grp#')[0]
+        for source, target in group:
+            cmds.blendShape(bS, edit=True, target=(target, 0, source, 1.0))
+
+        cmds.setAttr('%s.weight[0]' % bS, 1)
+        cmds.delete([source for source, target in group])
+        bSList.append(bS)
+
+    return bSList
+
+
+def benchmarkBSModes(pieces=500, subdivisions=10, frames=24, groupSize=None):
+    """Compares scene evaluation of per geometry blend shapes with grouped blend shapes
+        Parameters:
+            pieces (int): number of geometries to blend shape
+            subdivisions (int): subdivisions of each test sphere
+            frames (int): number of evaluated frames
+            groupSize (int): maximum number of geometries per deformer in grouped mode
+        Returns:
+            results (dict): mode as a key, (setup seconds, evaluation seconds) as a value
+    """
+
+    results = {}
+
+    for mode in ('perPiece', 'grouped'):
+        benchGrp, pairs = benchmarkSpheres(pieces, subdivisions, 'bsBenchmark_grp')
+
+        start = time.time()
+        if mode == 'grouped':
+            bSList = bSCreateGrouped(pairs, groupSize=groupSize)
+        else:
+            bSList = [bSCreate(source, target) for source, target in pairs]
+        setupTime = time.time() - start
+
+        # Animate all envelopes through one driver, the same way bSCtrlCreate connects them
+        driver = cmds.spaceLocator(name='bsBenchmark_loc')[0]
+        cmds.addAttr(driver, shortName='bsAmount', defaultValue=1.0, minValue=0, maxValue=1, keyable=True)
+        cmds.setKeyframe(driver, attribute='bsAmount', time=1, value=0)
+        cmds.setKeyframe(driver, attribute='bsAmount', time=frames, value=1)
+        for bS in bSList:
+            cmds.connectAttr('%s.bsAmount' % driver, '%s.envelope' % bS)
+
+        outMeshes = ['%s.outMesh' % i for i in cmds.listRelatives(benchGrp, allDescendents=True, type='mesh',
+                                                                  fullPath=True)]
+
+        start = time.time()
+        for frame in range(1, frames + 1):
+            cmds.currentTime(frame, update=False)
+            cmds.dgeval(outMeshes)
+        evalTime = time.time() - start
+
+        cmds.delete(benchGrp, driver)
+        leftovers = [i for i in bSList if cmds.objExists(i)]
+        if leftovers:
+            cmds.delete(leftovers)
+        results[mode] = (setupTime, evalTime)
+
+        print '%-8s %s deformers  setup %.3fs  %s frames %.3fs' % (mode, len(bSList), setupTime, frames, evalTime)
+
+    return results
+
+
 def bSCtrlCreate(bSList, origGeoList, *args):
     """Creates locator with an attribute for controlling all created blend shapes
         Parameters:
@@ -422,6 +1256,7 @@ def dialog(dupCheck, diaCaption, fileMode, okCaption):
     return dialogOut
 
 
+@jj_profiler.profiled()
 def duplicateCheck(*args):
     """Checks for name duplicates in a scene
         Returns:
@@ -429,17 +1264,9 @@ def duplicateCheck(*args):
             duplicateMeshes (list): list of duplicate meshes
 
      """
-    sceneMeshes = cmds.ls(type='mesh')
-    duplicateMeshes = []
-    dupExists = None
-
-    if sceneMeshes:
-        for i in sceneMeshes:
-            if sum('|%s' % (i.split('|')[-1]) in ii for ii in sceneMeshes) > 1:
-                dupExists = True
-                iParent = cmds.listRelatives(i, parent=True)[0]
-                if iParent not in duplicateMeshes:
-                    duplicateMeshes.append(iParent.encode('UTF8'))
+    # Single scene query, duplicates are found by grouping long paths by short names
+    sceneMeshes = cmds.ls(type='mesh', long=True) or []
+    dupExists, duplicateMeshes = jj_objUtils.duplicateParents(sceneMeshes)
 
     return dupExists, duplicateMeshes
 
@@ -487,6 +1314,40 @@ def queryEChckB():
     return forceOverwriteChckB, ignoreDuplicatesChckB
 
 
+def queryEngine():
+    """Check state of UI Engine checkbox
+            Returns:
+                engine (str): 'api' if API OBJ engine is checked, otherwise 'translator'
+    """
+
+    if cmds.checkBox('apiEngineChckB', query=True, value=True):
+        return 'api'
+
+    return 'translator'
+
+
+def queryGroupBSChckB():
+    """Check state of UI Group blend shapes checkbox
+            Returns:
+                groupBSChckB (bool): value of Group blend shapes checkbox
+    """
+
+    groupBSChckB = cmds.checkBox('groupBSChckB', query=True, value=True)
+
+    return groupBSChckB
+
+
+def queryForceChckB():
+    """Check state of UI Force full reimport checkbox
+            Returns:
+                forceReimportChckB (bool): value of Force full reimport checkbox
+    """
+
+    forceReimportChckB = cmds.checkBox('forceReimportChckB', query=True, value=True)
+
+    return forceReimportChckB
+
+
 def deleteChckBEnable(state, *args):
     """Check state of UI Export checkboxes
             Returns:
@@ -509,7 +1370,7 @@ def buildUI():
     mainColor = [0.33, 0.58, 0.63]
     buttonColor = [0.45, 0.45, 0.45]
     winWidth = 160
-    winHeight = 360
+    winHeight = 420
 
     columnMain = cmds.columnLayout()
 
@@ -530,6 +1391,8 @@ def buildUI():
 
     cmds.columnLayout(rowSpacing=2)
     cmds.checkBox('deleteChckB', label='Delete history', width=winWidth)
+    cmds.checkBox('groupBSChckB', label='Group blend shapes', width=winWidth)
+    cmds.checkBox('forceReimportChckB', label='Force full reimport', width=winWidth)
 
     # Export section
     cmds.setParent(columnMain)
@@ -552,6 +1415,7 @@ def buildUI():
     cmds.setParent(columnMain)
 
     cmds.columnLayout(rowSpacing=2)
+    cmds.checkBox('apiEngineChckB', label='Python OBJ engine', width=winWidth)
     cmds.button(label='Help', width=winWidth, c=help)
 
     cmds.rowColumnLayout(numberOfColumns=2, columnWidth=[(1, (winWidth / 2)), (2, (winWidth / 2))])
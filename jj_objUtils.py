@@ -0,0 +1,245 @@
+"""
+Maya independent helpers used by JJ Obj Toolkit. Nothing in this module imports maya,
+so the functions can be used, profiled and benchmarked from a plain Python interpreter.
+
+Run following script to benchmark the helpers outside of Maya.
+
+python jj_objUtils.py
+
+"""
+
+__author__ = "Jan Jinda"
+__version__ = "1.1.0"
+__email__ = "janjinda@janjinda.com"
+__website__ = "http://janjinda.com"
+
+import time
+
+from collections import defaultdict
+
+
+def shortNameIndex(paths):
+    """Groups long DAG paths by their short names in a single pass
+        Parameters:
+            paths (list): long DAG paths, e.g. output of cmds.ls(long=True)
+        Returns:
+            index (dict): short name as a key, list of matching long paths as a value
+    """
+    index = defaultdict(list)
+
+    for path in paths:
+        index[path.rsplit('|', 1)[-1]].append(path)
+
+    return dict(index)
+
+
+def duplicateParents(meshPaths):
+    """Finds transforms of all meshes sharing the same short name
+        Parameters:
+            meshPaths (list): long DAG paths of mesh shapes
+        Returns:
+            dupExists (bool): True if at least one short name is shared, otherwise None
+            duplicateMeshes (list): short names of transforms holding duplicate meshes
+    """
+    dupExists = None
+    duplicateMeshes = []
+    seen = set()
+
+    for shortName, paths in shortNameIndex(meshPaths).items():
+        if len(paths) < 2:
+            continue
+
+        dupExists = True
+        for path in paths:
+            # Parent transform is the path without the last component
+            parent = path.rsplit('|', 1)[0].rsplit('|', 1)[-1]
+            if parent and parent not in seen:
+                seen.add(parent)
+                duplicateMeshes.append(parent)
+
+    return dupExists, duplicateMeshes
+
+
+def parentPaths(shapePaths):
+    """Returns unique parent transforms of long shape paths keeping their order
+        Parameters:
+            shapePaths (list): long DAG paths of shapes
+        Returns:
+            parents (list): long DAG paths of parent transforms
+    """
+    parents = []
+    seen = set()
+
+    for path in shapePaths:
+        parent = path.rsplit('|', 1)[0]
+        if parent and parent not in seen:
+            seen.add(parent)
+            parents.append(parent)
+
+    return parents
+
+
+def lowerNameIndex(paths):
+    """Creates an inverted index of lowercase short names
+        Parameters:
+            paths (list): long DAG paths of scene transforms
+        Returns:
+            index (dict): lowercase short name as a key, list of long paths as a value,
+                          more than one path means the name is ambiguous
+    """
+    index = defaultdict(list)
+
+    for path in paths:
+        index[path.rsplit('|', 1)[-1].lower()].append(path)
+
+    return dict(index)
+
+
+def matchNames(sources, index, suffix='_obj'):
+    """Matches imported geometry names to scene geometries through a lowercase name index
+        Parameters:
+            sources (list): names of imported geometries
+            index (dict): output of lowerNameIndex
+            suffix (str): suffix added on import when a name already existed, stripped before matching
+        Returns:
+            matches (list): (source, target long path) pairs
+            unmatched (list): sources without any matching scene geometry
+            ambiguous (list): sources matching more than one scene geometry
+    """
+    matches = []
+    unmatched = []
+    ambiguous = []
+
+    for source in sources:
+        sourceLwr = source.lower()
+        candidates = [sourceLwr]
+
+        # Only trailing suffix is removed, names like 'door_object' stay untouched
+        if suffix and sourceLwr.endswith(suffix):
+            candidates.insert(0, sourceLwr[:-len(suffix)])
+
+        targets = None
+        for candidate in candidates:
+            targets = index.get(candidate)
+            if targets:
+                break
+
+        if not targets:
+            unmatched.append(source)
+        elif len(targets) > 1:
+            ambiguous.append(source)
+        else:
+            matches.append((source, targets[0]))
+
+    return matches, unmatched, ambiguous
+
+
+def syntheticMeshPaths(count, dupEvery=50, depth=3):
+    """Creates a list of fake long mesh paths resembling a production asset
+        Parameters:
+            count (int): number of paths to generate
+            dupEvery (int): every n-th mesh reuses the name of the previous one
+            depth (int): number of groups above each transform
+        Returns:
+            paths (list): list of long mesh paths
+    """
+    paths = []
+
+    for i in range(count):
+        num = i - 1 if dupEvery and i % dupEvery == 0 and i else i
+        groups = '|'.join('grp_%s_%s' % (level, i % (10 ** (level + 1))) for level in range(depth))
+        paths.append('|%s|panel_%06d_geo|panel_%06d_geoShape' % (groups, num, num))
+
+    return paths
+
+
+def _legacyDuplicateParents(meshPaths):
+    """Original substring scanning implementation, kept only for benchmarking"""
+    duplicateMeshes = []
+    dupExists = None
+
+    for i in meshPaths:
+        if sum('|%s' % (i.split('|')[-1]) in ii for ii in meshPaths) > 1:
+            dupExists = True
+            iParent = i.split('|')[-2]
+            if iParent not in duplicateMeshes:
+                duplicateMeshes.append(iParent)
+
+    return dupExists, duplicateMeshes
+
+
+def benchmarkDuplicateCheck(sizes=(1000, 10000, 100000), legacyLimit=2000):
+    """Times duplicate lookup on synthetic paths, legacy algorithm only for small sizes
+        Parameters:
+            sizes (list): numbers of synthetic mesh paths to test
+            legacyLimit (int): maximum size the quadratic algorithm is run on
+        Returns:
+            results (list): (size, index seconds, legacy seconds or None) per size
+    """
+    results = []
+
+    for size in sizes:
+        paths = syntheticMeshPaths(size)
+
+        start = time.time()
+        dupExists, duplicateMeshes = duplicateParents(paths)
+        indexTime = time.time() - start
+
+        legacyTime = None
+        if size <= legacyLimit:
+            start = time.time()
+            _legacyDuplicateParents(paths)
+            legacyTime = time.time() - start
+
+        results.append((size, indexTime, legacyTime))
+        print('%8d paths  index %.4fs  legacy %s  duplicates %s' %
+              (size, indexTime, '%.4fs' % legacyTime if legacyTime is not None else '-', len(duplicateMeshes)))
+
+    return results
+
+
+def _legacyMatchNames(sources, sceneGeos):
+    """Original matching through two linear scans of dictionary values, kept only for benchmarking"""
+    sceneGeos = dict((i, i.lower()) for i in sceneGeos)
+    keys = list(sceneGeos.keys())
+    values = list(sceneGeos.values())
+    matches = []
+
+    for source in sources:
+        targetLwr = source.lower().replace('_obj', '')
+        if targetLwr in values:
+            matches.append((source, keys[values.index(targetLwr)]))
+
+    return matches
+
+
+def benchmarkNameMatching(sceneSize=40000, sourceCount=2000):
+    """Times matching of imported OBJ names to scene geometries against the legacy approach
+        Parameters:
+            sceneSize (int): number of scene geometries
+            sourceCount (int): number of imported OBJs
+        Returns:
+            indexTime (float): seconds spent building the index and matching
+            legacyTime (float): seconds spent by the legacy approach
+    """
+    scenePaths = parentPaths(syntheticMeshPaths(sceneSize, dupEvery=0))
+    step = max(1, sceneSize // sourceCount)
+    sources = [scenePaths[i].rsplit('|', 1)[-1].upper() + '_obj' for i in range(0, sceneSize, step)][:sourceCount]
+
+    start = time.time()
+    matches = matchNames(sources, lowerNameIndex(scenePaths))[0]
+    indexTime = time.time() - start
+
+    start = time.time()
+    legacyMatches = _legacyMatchNames(sources, [path.rsplit('|', 1)[-1] for path in scenePaths])
+    legacyTime = time.time() - start
+
+    print('%d sources on %d scene geos  index %.4fs (%d matched)  legacy %.4fs (%d matched)' %
+          (len(sources), sceneSize, indexTime, len(matches), legacyTime, len(legacyMatches)))
+
+    return indexTime, legacyTime
+
+
+if __name__ == '__main__':
+    benchmarkDuplicateCheck()
+    benchmarkNameMatching()
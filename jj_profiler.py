@@ -0,0 +1,287 @@
+"""
+Lightweight instrumentation of JJ tools. Records wall time, number of Maya commands and memory per phase
+and exports them as json or Chrome trace (chrome://tracing, https://ui.perfetto.dev).
+
+Profiling is off by default. Disabled phases return a shared no-op context manager and Maya commands are
+counted only while profiling is enabled, when a counting proxy replaces cmds in the given modules.
+
+import jj_objToolkit
+import jj_profiler
+
+jj_profiler.enable([jj_objToolkit])
+jj_objToolkit.iMaster()
+jj_profiler.disable()
+jj_profiler.saveChromeTrace('/tmp/objImport.json')
+
+"""
+
+__author__ = "Jan Jinda"
+__version__ = "1.1.0"
+__email__ = "janjinda@janjinda.com"
+__website__ = "http://janjinda.com"
+
+import json
+import os
+import threading
+import time
+
+from collections import defaultdict
+from functools import wraps
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Module state, enabled flag is the only thing checked when profiling is off
+_enabled = False
+_events = []
+_commandCounts = defaultdict(int)
+_patchedModules = []
+_cmds = None
+_origin = time.time()
+
+
+class _NullPhase(object):
+    """Context manager doing nothing, shared by all phases while profiling is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _CommandCounter(object):
+    """Proxy of maya.cmds counting every called command"""
+
+    def __init__(self, cmds):
+        self._cmds = cmds
+
+    def __getattr__(self, name):
+        command = getattr(self._cmds, name)
+
+        if not callable(command):
+            return command
+
+        def counted(*args, **kwargs):
+            _commandCounts[name] += 1
+            return command(*args, **kwargs)
+
+        return counted
+
+
+class _Phase(object):
+    """Context manager recording a single phase"""
+
+    def __init__(self, name, category):
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.commands = dict(_commandCounts)
+        self.memoryStart = memory()
+        self.start = time.time()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        duration = time.time() - self.start
+        memoryEnd = memory()
+
+        commands = dict((name, count - self.commands.get(name, 0)) for name, count in _commandCounts.items()
+                        if count - self.commands.get(name, 0))
+
+        _events.append({'name': self.name,
+                        'category': self.category,
+                        'start': self.start - _origin,
+                        'duration': duration,
+                        'commands': commands,
+                        'commandCount': sum(commands.values()),
+                        'memory': max(self.memoryStart, memoryEnd),
+                        'thread': threading.current_thread().name})
+
+        return False
+
+
+def memory():
+    """Returns memory usage in megabytes, Maya heap inside of Maya, otherwise peak resident memory
+    of the process where available, 0 elsewhere"""
+    if _cmds is not None:
+        try:
+            return _cmds.memory(heapMemory=True, megaByte=True)
+        except (AttributeError, RuntimeError, TypeError):
+            pass
+
+    if resource is not None:
+        maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return maxRss / (1024.0 * 1024.0) if os.uname()[0] == 'Darwin' else maxRss / 1024.0
+
+    return 0
+
+
+def isEnabled():
+    return _enabled
+
+
+def enable(modules=()):
+    """Starts profiling
+        Parameters:
+            modules (list): modules whose cmds should be replaced by a counting proxy
+    """
+    global _enabled, _cmds
+
+    for module in modules:
+        cmds = getattr(module, 'cmds', None)
+        if cmds is not None and not isinstance(cmds, _CommandCounter):
+            _cmds = cmds
+            module.cmds = _CommandCounter(cmds)
+            _patchedModules.append(module)
+
+    _enabled = True
+
+
+def disable():
+    """Stops profiling and restores original cmds in all patched modules, recorded data are kept"""
+    global _enabled
+
+    _enabled = False
+
+    while _patchedModules:
+        module = _patchedModules.pop()
+        module.cmds = module.cmds._cmds
+
+
+def reset():
+    """Forgets all recorded data"""
+    global _origin
+
+    del _events[:]
+    _commandCounts.clear()
+    _origin = time.time()
+
+
+def phase(name, category='phase'):
+    """Returns context manager recording a phase, no-op while profiling is off
+        Parameters:
+            name (str): name of the phase, e.g. 'parse', 'cleanup', 'rename', 'blendShape', 'export'
+            category (str): category shown in Chrome trace
+    """
+    if not _enabled:
+        return _NULL_PHASE
+
+    return _Phase(name, category)
+
+
+def profiled(name=None):
+    """Decorator recording every call of a function as a phase
+        Parameters:
+            name (str): name of the phase, name of the function if not given
+    """
+
+    def decorator(func):
+        phaseName = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            with _Phase(phaseName, 'function'):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def events():
+    """Returns copy of all recorded phases
+        Returns:
+            events (list): dictionaries with name, category, start, duration, commands, commandCount,
+                           memory and thread keys, start and duration in seconds, memory in megabytes
+    """
+    return [dict(i) for i in _events]
+
+
+def summary():
+    """Sums recorded phases by name
+        Returns:
+            summary (dict): phase name as a key, dictionary with calls, duration, commandCount and
+                            peakMemory as a value
+    """
+    result = {}
+
+    for event in _events:
+        item = result.setdefault(event['name'], {'calls': 0, 'duration': 0.0, 'commandCount': 0, 'peakMemory': 0})
+        item['calls'] += 1
+        item['duration'] += event['duration']
+        item['commandCount'] += event['commandCount']
+        item['peakMemory'] = max(item['peakMemory'], event['memory'])
+
+    return result
+
+
+def printSummary():
+    """Prints summary of recorded phases, slowest first
+        Returns:
+            report (str): printed report
+    """
+    items = sorted(summary().items(), key=lambda i: i[1]['duration'], reverse=True)
+    lines = ['%-20s %6s %10s %10s %12s' % ('Phase', 'Calls', 'Seconds', 'Commands', 'Peak MB')]
+    lines.extend('%-20s %6d %10.3f %10d %12.1f' % (name, i['calls'], i['duration'], i['commandCount'],
+                                                   i['peakMemory']) for name, i in items)
+    report = '\n'.join(lines)
+
+    print(report)
+
+    return report
+
+
+def saveJson(path):
+    """Writes recorded phases and their summary to a json file
+        Returns:
+            path (str): path to the written file
+    """
+    with open(path, 'w') as f:
+        json.dump({'events': events(), 'summary': summary()}, f, indent=4)
+
+    return path
+
+
+def chromeTrace():
+    """Converts recorded phases to Chrome trace event format
+        Returns:
+            trace (dict): trace with complete events, times in microseconds
+    """
+    threads = {}
+    traceEvents = []
+
+    for event in _events:
+        tid = threads.setdefault(event['thread'], len(threads) + 1)
+        traceEvents.append({'name': event['name'],
+                            'cat': event['category'],
+                            'ph': 'X',
+                            'ts': event['start'] * 1e6,
+                            'dur': event['duration'] * 1e6,
+                            'pid': os.getpid(),
+                            'tid': tid,
+                            'args': {'commandCount': event['commandCount'],
+                                     'commands': event['commands'],
+                                     'memoryMB': event['memory']}})
+
+    return {'traceEvents': traceEvents, 'displayTimeUnit': 'ms'}
+
+
+def saveChromeTrace(path):
+    """Writes recorded phases as Chrome trace json file
+        Returns:
+            path (str): path to the written file
+    """
+    with open(path, 'w') as f:
+        json.dump(chromeTrace(), f)
+
+    return path
@@ -0,0 +1,142 @@
+"""
+Maya independent symmetry maps of meshes used by JJ BS Toolkit to mirror blend shapes as array
+operations. Nothing in this module imports maya.
+
+A symmetry map stores for every vertex the index of its mirrored counterpart, found as the nearest
+vertex to its reflected position. Nearest vertices are looked up in a KD-tree when SciPy is available,
+otherwise in a uniform grid. Mirroring is a single NumPy gather when NumPy is available.
+
+import jj_symmetry
+mapping, unmatched = jj_symmetry.symmetryMap(basePoints, axis=0)
+mirrored = jj_symmetry.mirrorPoints(basePoints, shapePoints, mapping, axis=0)
+
+"""
+
+__author__ = "Jan Jinda"
+__version__ = "1.1.0"
+__email__ = "janjinda@janjinda.com"
+__website__ = "http://janjinda.com"
+
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Maximum distance between a reflected vertex and its counterpart
+TOLERANCE = 1e-3
+
+
+def _triples(points):
+    """Splits flat x, y, z sequence to a list of (x, y, z) tuples"""
+    values = points.tolist() if hasattr(points, 'tolist') else list(points)
+    return list(zip(*[iter(values)] * 3))
+
+
+def _gridMap(points, reflected, tolerance):
+    """Nearest point lookup through a uniform grid with cells of tolerance size
+        Returns:
+            mapping (list): index of the nearest point per reflected point, -1 if none is within tolerance
+    """
+    cell = float(tolerance)
+    grid = {}
+
+    for index, (x, y, z) in enumerate(points):
+        grid.setdefault((int(x // cell), int(y // cell), int(z // cell)), []).append(index)
+
+    mapping = []
+    offsets = [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)]
+    limit = tolerance * tolerance
+
+    for x, y, z in reflected:
+        cx, cy, cz = int(x // cell), int(y // cell), int(z // cell)
+        best = -1
+        bestDistance = limit
+
+        for i, j, k in offsets:
+            for index in grid.get((cx + i, cy + j, cz + k), ()):
+                px, py, pz = points[index]
+                distance = (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2
+                if distance <= bestDistance:
+                    best = index
+                    bestDistance = distance
+
+        mapping.append(best)
+
+    return mapping
+
+
+def symmetryMap(points, axis=0, tolerance=TOLERANCE):
+    """Finds mirrored counterpart of every vertex
+        Parameters:
+            points (array): flat x, y, z coordinates of a symmetrical mesh
+            axis (int): index of the mirror axis, 0 for X, 1 for Y, 2 for Z
+            tolerance (float): maximum distance between a reflected vertex and its counterpart
+        Returns:
+            mapping (array): index of the mirrored vertex per vertex, vertices without a counterpart
+                             are mapped to themselves, see mirrorPoints to keep them untouched
+            unmatched (list): indices of vertices without a counterpart
+    """
+    triples = _triples(points)
+    reflected = [tuple(-c if i == axis else c for i, c in enumerate(p)) for p in triples]
+
+    if cKDTree is not None and triples:
+        distances, indices = cKDTree(triples).query(reflected, distance_upper_bound=tolerance)
+        mapping = [int(index) if distance <= tolerance else -1 for distance, index in zip(distances, indices)]
+    else:
+        mapping = _gridMap(triples, reflected, tolerance)
+
+    unmatched = [index for index, mirrored in enumerate(mapping) if mirrored < 0]
+    for index in unmatched:
+        mapping[index] = index
+
+    if numpy is not None:
+        return numpy.asarray(mapping, dtype=numpy.int64), unmatched
+
+    return array('i', mapping), unmatched
+
+
+def mirrorPoints(basePoints, shapePoints, mapping, axis=0, unmatched=(), targetPoints=None):
+    """Mirrors a shape of a symmetrical mesh, every vertex gets reflected delta of its counterpart
+        Parameters:
+            basePoints (array): flat x, y, z coordinates of the base mesh
+            shapePoints (array): flat x, y, z coordinates of the shape with the same topology
+            mapping (array): output of symmetryMap for the base mesh
+            axis (int): index of the mirror axis
+            unmatched (list): indices of vertices without a counterpart from symmetryMap
+            targetPoints (array): flat x, y, z coordinates unmatched vertices keep, they get reflected
+                                  delta of their own otherwise
+        Returns:
+            points (array): flat x, y, z coordinates of the mirrored shape
+    """
+    if numpy is not None:
+        base = numpy.asarray(basePoints, dtype=numpy.float64).reshape(-1, 3)
+        deltas = numpy.asarray(shapePoints, dtype=numpy.float64).reshape(-1, 3) - base
+        sign = numpy.ones(3)
+        sign[axis] = -1.0
+        points = base + deltas[numpy.asarray(mapping)] * sign
+        if len(unmatched) and targetPoints is not None:
+            indices = numpy.asarray(unmatched, dtype=numpy.int64)
+            points[indices] = numpy.asarray(targetPoints, dtype=numpy.float64).reshape(-1, 3)[indices]
+        return points.ravel()
+
+    base = _triples(basePoints)
+    shape = _triples(shapePoints)
+    points = array('d')
+
+    for index, mirrored in enumerate(mapping):
+        for i in range(3):
+            delta = shape[mirrored][i] - base[mirrored][i]
+            points.append(base[index][i] + (-delta if i == axis else delta))
+
+    if targetPoints is not None:
+        for index in unmatched:
+            points[index * 3:index * 3 + 3] = array('d', targetPoints[index * 3:index * 3 + 3])
+
+    return points